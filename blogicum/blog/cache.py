@@ -0,0 +1,359 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.forms import ModelChoiceField
+from django.template import engines
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from .models import Post
+from .visibility import get_feed_visibility
+
+PAGE_CACHE_PREFIX = 'blog:page'
+POST_CARD_CACHE_PREFIX = 'blog:post_card'
+COUNT_CACHE_PREFIX = 'blog:count'
+DETAIL_SHELL_CACHE_PREFIX = 'blog:detail_shell'
+VERSION_CACHE_PREFIX = 'blog:version'
+
+# Область «вся лента»: меняется при любом изменении, видимом в ленте.
+GLOBAL_SCOPE = ('global',)
+# Варианты выбора категорий и местоположений в формах.
+FORM_CHOICES_SCOPE = ('form_choices',)
+
+
+def category_scope(slug):
+    """Область страницы категории."""
+    return ('category', slug)
+
+
+def author_scope(username):
+    """Область страницы пользователя."""
+    return ('author', username)
+
+
+def post_scope(post_id):
+    """Область страницы поста: сам пост и комментарии к нему."""
+    return ('post', post_id)
+
+
+def get_shared_cache():
+    """
+    Кеш, общий для всех процессов: версии областей, граница видимости
+    постов и блокировки сборки страниц.
+    """
+    return caches[settings.SHARED_CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return ':'.join((VERSION_CACHE_PREFIX, *map(str, scope)))
+
+
+def get_scope_versions(scopes):
+    """
+    Возвращает версии областей кеша в порядке scopes.
+    Версия — момент последнего изменения области в наносекундах;
+    отсутствующие в кеше версии создаются. Версии хранятся
+    CACHE_VERSION_TIMEOUT секунд: заново созданная версия больше любой
+    прежней, поэтому истечение срока лишь сбрасывает зависящие ключи.
+    """
+    shared_cache = get_shared_cache()
+    keys = [_version_key(scope) for scope in scopes]
+    versions = shared_cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        for key, version in missing.items():
+            shared_cache.add(key, version, settings.CACHE_VERSION_TIMEOUT)
+        versions.update(shared_cache.get_many(list(missing)))
+    return [versions.get(key, missing.get(key)) for key in keys]
+
+
+def bump_scopes(scopes):
+    """Меняет версии областей, делая устаревшими все зависящие ключи."""
+    keys = {_version_key(scope) for scope in scopes}
+    if not keys:
+        return
+    shared_cache = get_shared_cache()
+    now = time.time_ns()
+    current = shared_cache.get_many(list(keys))
+    shared_cache.set_many(
+        {key: max(current.get(key, 0) + 1, now) for key in keys},
+        settings.CACHE_VERSION_TIMEOUT)
+
+
+def get_posts_scopes(posts):
+    """
+    Возвращает области кеша, в которых отображаются посты из posts:
+    всю ленту, их категории, страницы их авторов и страницы самих постов.
+    """
+    scopes = {GLOBAL_SCOPE}
+    for pk, slug, username in posts.order_by().values_list(
+            'pk', 'category__slug', 'author__username').distinct():
+        scopes.add(post_scope(pk))
+        if slug is not None:
+            scopes.add(category_scope(slug))
+        if username is not None:
+            scopes.add(author_scope(username))
+    return scopes
+
+
+def get_post_scopes(post_id):
+    """Возвращает области кеша, в которых отображается пост."""
+    return get_posts_scopes(Post.objects.filter(pk=post_id))
+
+
+def get_page_cache_key(request, scopes):
+    """
+    Ключ кеша страницы: адрес с номером страницы, версии областей
+    и граница видимости постов.
+    """
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    versions = '.'.join(map(str, get_scope_versions(scopes)))
+    cutoff = get_feed_visibility().cutoff.timestamp()
+    return f'{PAGE_CACHE_PREFIX}:{url}:{versions}:{cutoff}'
+
+
+def get_count_cache_key(scopes, mode=''):
+    """
+    Ключ кеша количества постов в ленте: области ленты, режим выборки
+    (например, собственные посты автора), версии областей и граница
+    видимости постов.
+    """
+    names = '|'.join(':'.join(map(str, scope)) for scope in scopes)
+    versions = '.'.join(map(str, get_scope_versions(scopes)))
+    cutoff = get_feed_visibility().cutoff.timestamp()
+    return f'{COUNT_CACHE_PREFIX}:{names}:{mode}:{versions}:{cutoff}'
+
+
+def _get_templates_mtime():
+    mtimes = [0]
+    for template_settings in settings.TEMPLATES:
+        for template_dir in template_settings.get('DIRS', ()):
+            for root, _, files in os.walk(template_dir):
+                mtimes.extend(
+                    os.stat(os.path.join(root, name)).st_mtime_ns
+                    for name in files)
+    return max(mtimes)
+
+
+_get_cached_templates_mtime = lru_cache(maxsize=None)(_get_templates_mtime)
+
+
+def get_templates_version():
+    """
+    Момент последнего изменения шаблонов проекта в наносекундах.
+    Вне режима отладки вычисляется один раз за время жизни процесса.
+    """
+    if settings.DEBUG:
+        return _get_templates_mtime()
+    return _get_cached_templates_mtime()
+
+
+def get_detail_shell_cache_key(request, post_id, create=True):
+    """
+    Ключ общей для всех пользователей копии страницы поста: адрес
+    страницы, версия области поста и версия шаблонов. С create=False
+    версия не создаётся: если её нет в кеше, возвращается None, так что
+    запросы к несуществующим постам не оставляют версий в кеше.
+    """
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    if create:
+        version, = get_scope_versions([post_scope(post_id)])
+    else:
+        version = get_shared_cache().get(_version_key(post_scope(post_id)))
+        if version is None:
+            return None
+    return (f'{DETAIL_SHELL_CACHE_PREFIX}:{post_id}:{url}:{version}:'
+            f'{get_templates_version()}')
+
+
+def get_stale_page_cache_key(request):
+    """
+    Ключ последней собранной версии страницы. Не зависит от версий
+    областей, поэтому переживает сброс кеша и отдаётся, пока другой
+    запрос собирает страницу заново.
+    """
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'{PAGE_CACHE_PREFIX}:stale:{url}'
+
+
+def cache_page_response(key, response, stale_key=None):
+    """Сохраняет отрендеренный ответ в кеш страниц."""
+    cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+    if stale_key is not None:
+        cache.set(stale_key, response, settings.PAGE_CACHE_STALE_TIMEOUT)
+
+
+def wait_for_cache(key, timeout, interval=0.05):
+    """
+    Ждёт появления значения в кеше не дольше timeout секунд.
+    Возвращает значение или None.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        value = cache.get(key)
+        if value is not None or time.monotonic() >= deadline:
+            return value
+        time.sleep(interval)
+
+
+# Ограничение числа страниц, одновременно собираемых процессом после
+# промаха кеша.
+page_regeneration_slots = threading.BoundedSemaphore(
+    settings.PAGE_CACHE_MAX_REGENERATIONS)
+
+
+class LocalLRUCache():
+    """
+    Небольшой LRU-кеш в памяти процесса для редко меняющихся объектов.
+    Записи живут не дольше timeout секунд, чтобы изменения, сделанные
+    в других процессах, не оставались незамеченными надолго.
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + self.timeout)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+# Опубликованные категории по slug и пользователи по username.
+category_lookup_cache = LocalLRUCache(
+    settings.LOOKUP_CACHE_SIZE, settings.LOOKUP_CACHE_TIMEOUT)
+author_lookup_cache = LocalLRUCache(
+    settings.LOOKUP_CACHE_SIZE, settings.LOOKUP_CACHE_TIMEOUT)
+
+# Разметка пустых форм по классу формы.
+form_html_cache = LocalLRUCache(
+    settings.FORM_HTML_CACHE_SIZE, settings.FORM_HTML_CACHE_TIMEOUT)
+
+
+def precompile_templates(names=None):
+    """
+    Загружает шаблоны из PRECOMPILED_TEMPLATES, чтобы кеширующий загрузчик
+    разобрал их до первого запроса. Возвращает загруженные шаблоны.
+    """
+    engine = engines['django']
+    return [
+        engine.get_template(name)
+        for name in names or settings.PRECOMPILED_TEMPLATES
+    ]
+
+
+def get_post_card_cache_key(post):
+    """
+    Ключ кеша карточки поста. Включает всё, что выводится в карточке:
+    момент изменения поста, анонс, число комментариев, имя автора,
+    категорию и местоположение, поэтому отдельный сброс кеша карточек
+    не нужен. Анонс входит в ключ явно: массовый пересчёт анонсов
+    не меняет updated_at.
+    """
+    category = post.category
+    location = post.location
+    parts = (
+        post.updated_at.isoformat(),
+        post.excerpt,
+        post.comment_count,
+        post.author.username,
+        category and (category.slug, category.title, category.is_published),
+        location and (location.name, location.is_published),
+    )
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f'{POST_CARD_CACHE_PREFIX}:{post.pk}:{digest}'
+
+
+def render_post_cards(posts):
+    """
+    Возвращает HTML карточек постов, по возможности беря его из кеша.
+    Все карточки страницы читаются и записываются одним обращением к кешу.
+    """
+    keys = [get_post_card_cache_key(post) for post in posts]
+    cached = cache.get_many(keys)
+    rendered = {}
+    cards = []
+    for key, post in zip(keys, posts):
+        html = cached.get(key)
+        if html is None:
+            html = render_to_string(
+                'blog/includes/post_card.html', {'post': post},
+                using=settings.FEED_TEMPLATE_ENGINE)
+            rendered[key] = html
+        cards.append(mark_safe(html))
+    if rendered:
+        cache.set_many(rendered, settings.POST_CARD_CACHE_TIMEOUT)
+    return cards
+
+
+def can_prerender_form(form):
+    """
+    Разметка формы одинакова для всех запросов, если класс формы это
+    допускает (атрибут prerender), форма не заполнена данными запроса
+    и не редактирует сохранённый объект.
+    """
+    instance = getattr(form, 'instance', None)
+    return (
+        getattr(form, 'prerender', False)
+        and not form.is_bound
+        and (instance is None or instance.pk is None)
+    )
+
+
+def get_form_html_cache_key(form):
+    """
+    Ключ разметки пустой формы. Для форм со списками объектов из базы
+    в ключ входит версия FORM_CHOICES_SCOPE.
+    """
+    key = (type(form), form.prefix, get_language())
+    if any(isinstance(field, ModelChoiceField)
+           for field in form.fields.values()):
+        key += tuple(get_scope_versions([FORM_CHOICES_SCOPE]))
+    return key
+
+
+def render_form(form):
+    """
+    Возвращает разметку полей формы и кнопки отправки. Пустые формы
+    рендерятся один раз на процесс, остальные — при каждом вызове.
+    """
+    if not can_prerender_form(form):
+        return render_to_string('includes/form_fields.html', {'form': form})
+    key = get_form_html_cache_key(form)
+    html = form_html_cache.get(key)
+    if html is None:
+        html = render_to_string('includes/form_fields.html', {'form': form})
+        form_html_cache.set(key, html)
+    return mark_safe(html)
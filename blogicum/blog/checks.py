@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Бэкенды кеша, данные которых видны только одному процессу.
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Версии областей кеша, граница видимости постов и блокировки сборки
+    страниц хранятся в кеше SHARED_CACHE_ALIAS. Если он не общий для всех
+    процессов, изменения, сделанные в одном процессе, не сбрасывают
+    страницы, счётчики и ETag в остальных.
+    """
+    backend = settings.CACHES[settings.SHARED_CACHE_ALIAS]['BACKEND']
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHE_BACKENDS:
+        return []
+    return [Warning(
+        'Общий кеш хранится в памяти процесса: при нескольких '
+        'процессах-обработчиках они будут отдавать устаревшие страницы.',
+        hint=('Укажите для SHARED_CACHE_ALIAS общий бэкенд, например '
+              'Memcached (django.core.cache.backends.memcached'
+              '.PyMemcacheCache).'),
+        obj=backend,
+        id='blog.W001',
+    )]
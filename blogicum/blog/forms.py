@@ -18,6 +18,8 @@ class ProfileEditForm(UserChangeForm):
 class PostCreateForm(forms.ModelForm):
     """Форма для создания и редактирования поста."""
 
+    prerender = True
+
     class Meta:
         model = Post
         exclude = ('author',)
@@ -30,6 +32,8 @@ class PostCreateForm(forms.ModelForm):
 class CommentCreateForm(forms.ModelForm):
     """Форма для создания и редактирования комментария."""
 
+    prerender = True
+
     class Meta:
         model = Comment
         fields = ('text', )
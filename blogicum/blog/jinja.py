@@ -0,0 +1,75 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.template import Context, engines
+from django.template.backends.jinja2 import Jinja2
+from django.template.defaultfilters import date, linebreaksbr
+from django.templatetags.static import static
+from django.utils.formats import localize
+from django.utils.html import conditional_escape
+from django.utils.timezone import template_localtime
+from jinja2 import Environment, FileSystemBytecodeCache, pass_context
+
+from .cache import render_post_cards
+from .personalization import get_placeholder, render_personal_fragment
+from .routing import fast_reverse
+
+
+def date_filter(value, arg=None):
+    """Аналог фильтра date с переводом в текущий часовой пояс."""
+    return date(template_localtime(value), arg)
+
+
+def localize_filter(value):
+    """Выводит значение так же, как {{ value }} в шаблонах Django."""
+    return localize(template_localtime(value))
+
+
+def post_cards(posts):
+    """Аналог тега {% post_cards %}."""
+    return render_post_cards(list(posts))
+
+
+@pass_context
+def personal(context, name, **params):
+    """Аналог тега {% personal %}."""
+    if context.get('shared_shell'):
+        return get_placeholder(name, params)
+    return render_personal_fragment(name, Context(context.get_all()), params)
+
+
+def environment(**options):
+    """
+    Окружение Jinja2 для шаблонов лент. Скомпилированные шаблоны
+    сохраняются на диск, значения экранируются так же, как в Django,
+    чтобы HTML совпадал с шаблонами Django.
+    """
+    options.setdefault('bytecode_cache', FileSystemBytecodeCache(
+        settings.JINJA2_BYTECODE_CACHE_DIR))
+    options.setdefault('finalize', conditional_escape)
+    env = Environment(**options)
+    env.globals.update({
+        'url': fast_reverse,
+        'static': static,
+        'personal': personal,
+        'post_cards': post_cards,
+    })
+    env.filters.update({
+        'date': date_filter,
+        'localize': localize_filter,
+        'linebreaksbr': linebreaksbr,
+    })
+    return env
+
+
+@lru_cache(maxsize=None)
+def get_engine():
+    """
+    Движок Jinja2 из JINJA2_TEMPLATES, даже если шаблоны лент на Jinja2
+    не включены настройкой POST_JINJA2_TEMPLATES.
+    """
+    if settings.POST_JINJA2_TEMPLATES:
+        return engines['jinja2']
+    params = dict(settings.JINJA2_TEMPLATES)
+    params.pop('BACKEND')
+    return Jinja2({**params, 'NAME': 'jinja2'})
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import bump_scopes, get_posts_scopes
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает анонс и HTML текста у существующих постов, например
+    после изменения Post.render_text. Новые базы заполняет миграция 0012.
+    """
+
+    help = ('Пересчитывает Post.excerpt и Post.body_html из текста постов '
+            'пачками заданного размера.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Количество постов, обрабатываемых за один запрос.')
+
+    def handle(self, *args, batch_size, **options):
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk').only(
+                    'text')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for post in batch:
+                post.render_text()
+            Post.objects.bulk_update(batch, ('excerpt', 'body_html'))
+            # bulk_update не отправляет сигналы: кеш страниц с этими
+            # постами сбрасывается явно. Карточки с новым анонсом
+            # получают новый ключ кеша.
+            bump_scopes(get_posts_scopes(
+                Post.objects.filter(pk__in=[post.pk for post in batch])))
+            updated += len(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено постов: {updated}.'))
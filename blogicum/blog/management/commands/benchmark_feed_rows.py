@@ -0,0 +1,66 @@
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+
+from blog.rows import as_feed_rows
+from blog.utils import get_queryset_posts
+
+
+def load_and_render(queryset, per_page, number):
+    """Загружает страницу ленты и рендерит её карточки без кеша."""
+    posts = list(Paginator(queryset, per_page).page(number).object_list)
+    for post in posts:
+        render_to_string('blog/includes/post_card.html', {'post': post})
+    return posts
+
+
+class Command(BaseCommand):
+    """Сравнивает загрузку страниц ленты моделями и строками PostRow."""
+
+    help = ('Измеряет время и объём выделенной памяти на страницу ленты '
+            'для экземпляров моделей и для строк PostRow.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=5,
+            help='Количество первых страниц ленты, участвующих в замере.')
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Сколько раз загружается каждая страница.')
+
+    def handle(self, *args, pages, repeat, **options):
+        per_page = settings.POST_LIMIT_FOR_PAGINATE
+        queryset = get_queryset_posts()
+        if not queryset.exists():
+            raise CommandError('В ленте нет постов для замера.')
+        pages = min(pages, Paginator(queryset, per_page).num_pages)
+        paths = (
+            ('ORM', queryset),
+            ('PostRow', as_feed_rows(queryset)),
+        )
+        for name, rows in paths:
+            # Первый проход прогревает шаблоны и соединение с базой.
+            load_and_render(rows, per_page, 1)
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for number in range(1, pages + 1):
+                    load_and_render(rows, per_page, number)
+            elapsed = (time.perf_counter() - started) / (repeat * pages)
+
+            tracemalloc.start()
+            for number in range(1, pages + 1):
+                load_and_render(rows, per_page, number)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            self.stdout.write(
+                f'{name:>8}: {elapsed * 1000:.2f} мс на страницу, '
+                f'пик памяти на страницу {peak / 1024:.1f} КиБ')
@@ -0,0 +1,62 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.template import engines
+
+from blog.utils import get_comments_page, get_queryset_posts
+
+BENCHMARKED_TEMPLATES = (
+    'blog/includes/post_card.html',
+    'includes/paginator.html',
+    'includes/comment_list.html',
+)
+
+
+def measure(engine, name, context, repeat):
+    """Среднее время рендеринга шаблона в миллисекундах."""
+    template = engine.get_template(name)
+    template.render(context)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        template.render(context)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+class Command(BaseCommand):
+    """Сравнивает рендеринг шаблонов лент в Django и в Jinja2."""
+
+    help = ('Измеряет время рендеринга карточки поста, пагинатора '
+            'и списка комментариев шаблонами Django и Jinja2.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=500,
+            help='Сколько раз рендерится каждый шаблон.')
+
+    def handle(self, *args, repeat, **options):
+        try:
+            from blog.jinja import get_engine
+        except ImportError:
+            raise CommandError('Для замера установите пакет Jinja2.')
+        posts = get_queryset_posts()
+        post = posts.first()
+        if post is None:
+            raise CommandError('В ленте нет постов для замера.')
+        context = {
+            'post': post,
+            'page_obj': Paginator(
+                posts, settings.POST_LIMIT_FOR_PAGINATE).page(1),
+            'comments': get_comments_page(post),
+        }
+        django_engine = engines['django']
+        jinja2_engine = get_engine()
+        for name in BENCHMARKED_TEMPLATES:
+            django_time = measure(django_engine, name, context, repeat)
+            jinja2_time = measure(jinja2_engine, name, context, repeat)
+            self.stdout.write(
+                f'{name}: Django {django_time:.3f} мс, '
+                f'Jinja2 {jinja2_time:.3f} мс')
@@ -0,0 +1,79 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.template import Context
+from django.template.backends.django import DjangoTemplates
+
+from blog.forms import CommentCreateForm
+from blog.utils import get_comments_page, get_queryset_posts
+
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+BENCHMARKED_TEMPLATES = (
+    'base.html',
+    'blog/includes/post_card.html',
+    'includes/comments.html',
+    'includes/paginator.html',
+)
+
+
+def build_engine(name, loaders):
+    """Создаёт движок шаблонов проекта с заданными загрузчиками."""
+    return DjangoTemplates({
+        'NAME': name,
+        'DIRS': [settings.TEMPLATES_DIR],
+        'APP_DIRS': False,
+        'OPTIONS': {'loaders': loaders},
+    }).engine
+
+
+def measure(engine, name, context, repeat):
+    """Среднее время загрузки и рендеринга шаблона в миллисекундах."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        engine.get_template(name).render(Context(context))
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+class Command(BaseCommand):
+    """Сравнивает рендеринг шаблонов с кешированием загрузчика и без него."""
+
+    help = ('Измеряет время загрузки и рендеринга основных шаблонов '
+            'при чтении с диска на каждый рендер и с cached.Loader.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=200,
+            help='Сколько раз рендерится каждый шаблон.')
+
+    def handle(self, *args, repeat, **options):
+        posts = get_queryset_posts()
+        post = posts.first()
+        if post is None:
+            raise CommandError('В ленте нет постов для замера.')
+        context = {
+            'post': post,
+            'page_obj': Paginator(
+                posts, settings.POST_LIMIT_FOR_PAGINATE).page(1),
+            'comments': get_comments_page(post),
+            'form': CommentCreateForm(),
+        }
+        uncached = build_engine('uncached', LOADERS)
+        cached = build_engine(
+            'cached', [('django.template.loaders.cached.Loader', LOADERS)])
+        for name in BENCHMARKED_TEMPLATES:
+            # Первый рендер заполняет кеш загрузчика, как при запуске.
+            cached.get_template(name).render(Context(context))
+            without_cache = measure(uncached, name, context, repeat)
+            with_cache = measure(cached, name, context, repeat)
+            self.stdout.write(
+                f'{name}: {without_cache:.3f} мс без кеша, '
+                f'{with_cache:.3f} мс с cached.Loader '
+                f'(экономия {without_cache - with_cache:.3f} мс)')
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from blog.cache import bump_scopes, get_posts_scopes
+from blog.models import Post
+from blog.visibility import reset_feed_visibility
+
+# То же условие, по которому флаг заполняет миграция 0010.
+VISIBLE_POSTS = Q(is_published=True, category__is_published=True)
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает флаг видимости постов, записанных в обход Post.save:
+    через bulk_create, QuerySet.update() или правку базы вручную.
+    """
+
+    help = ('Пересчитывает Post.is_visible по статусу публикации поста '
+            'и его категории.')
+
+    def handle(self, *args, **options):
+        shown = list(Post.objects.filter(
+            VISIBLE_POSTS, is_visible=False).values_list('pk', flat=True))
+        hidden = list(Post.objects.filter(is_visible=True).exclude(
+            VISIBLE_POSTS).values_list('pk', flat=True))
+        with transaction.atomic():
+            Post.objects.filter(pk__in=shown).update(is_visible=True)
+            Post.objects.filter(pk__in=hidden).update(is_visible=False)
+        if shown or hidden:
+            # update() не отправляет сигналы: кеш страниц с этими постами
+            # и граница видимости сбрасываются явно.
+            bump_scopes(get_posts_scopes(
+                Post.objects.filter(pk__in=shown + hidden)))
+            reset_feed_visibility()
+        self.stdout.write(self.style.SUCCESS(
+            f'Показано постов: {len(shown)}, скрыто: {len(hidden)}.'))
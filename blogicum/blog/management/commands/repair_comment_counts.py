@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    """Находит и исправляет расхождения в счётчиках комментариев постов."""
+
+    help = ('Сверяет Post.comment_count с фактическим количеством '
+            'комментариев и исправляет расхождения.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество постов, проверяемых за один запрос.')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, ничего не исправляя.')
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        repaired = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk').annotate(
+                    actual_count=Count('comments')
+                ).values_list('pk', 'comment_count', 'actual_count')[
+                    :batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            drifted = [
+                (pk, actual) for pk, stored, actual in batch
+                if stored != actual
+            ]
+            for pk, actual in drifted:
+                self.stdout.write(
+                    f'Пост {pk}: счётчик будет исправлен на {actual}.')
+            if dry_run or not drifted:
+                repaired += len(drifted)
+                continue
+            # Пересчитываем прямо в UPDATE, чтобы не затереть комментарии,
+            # добавленные между проверкой и исправлением.
+            with transaction.atomic():
+                for pk, _ in drifted:
+                    Post.objects.filter(pk=pk).update(
+                        comment_count=Coalesce(
+                            Subquery(
+                                Comment.objects.filter(post=pk).order_by(
+                                ).values('post').annotate(
+                                    total=Count('pk')
+                                ).values('total'),
+                                output_field=IntegerField()),
+                            0)
+                    )
+            repaired += len(drifted)
+        action = 'Найдено' if dry_run else 'Исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} расхождений: {repaired}.'))
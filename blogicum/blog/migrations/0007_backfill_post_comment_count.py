@@ -0,0 +1,40 @@
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# Количество постов, обрабатываемых за один UPDATE.
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_comment_count(apps, schema_editor):
+    """Заполняет счётчик комментариев у существующих постов пачками."""
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    comments_total = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    last_pk = 0
+    while True:
+        batch = list(
+            Post.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', flat=True)[:BACKFILL_BATCH_SIZE]
+        )
+        if not batch:
+            break
+        Post.objects.filter(pk__in=batch).update(
+            comment_count=Coalesce(
+                Subquery(comments_total, output_field=IntegerField()), 0)
+        )
+        last_pk = batch[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_comment_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+# Количество постов, обрабатываемых за один UPDATE.
+BACKFILL_BATCH_SIZE = 500
+
+# Значения из blog.models на момент миграции (см. Post.render_text).
+POST_EXCERPT_WORDS = 10
+POST_EXCERPT_MAX_LENGTH = 512
+
+
+def backfill_excerpt_body_html(apps, schema_editor):
+    """Заполняет анонс и HTML текста у существующих постов пачками."""
+    Post = apps.get_model('blog', 'Post')
+    last_pk = 0
+    while True:
+        batch = list(
+            Post.objects.filter(pk__gt=last_pk).order_by('pk').only(
+                'text')[:BACKFILL_BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for post in batch:
+            post.excerpt = Truncator(
+                Truncator(post.text).words(
+                    POST_EXCERPT_WORDS, truncate=' …')
+            ).chars(POST_EXCERPT_MAX_LENGTH)
+            post.body_html = linebreaksbr(post.text)
+        Post.objects.bulk_update(batch, ('excerpt', 'body_html'))
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_excerpt_body_html'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_excerpt_body_html, migrations.RunPython.noop),
+    ]
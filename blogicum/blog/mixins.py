@@ -1,9 +1,45 @@
-from django.shortcuts import get_object_or_404, redirect
+import hashlib
+from datetime import datetime
 
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import redirect
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .cache import (
+    GLOBAL_SCOPE, cache_page_response, get_count_cache_key,
+    get_page_cache_key, get_scope_versions, get_shared_cache,
+    get_stale_page_cache_key,
+    get_templates_version, page_regeneration_slots, post_scope,
+    wait_for_cache)
 from .models import Comment, Post
+from .pagination import (
+    CachedCountPaginator, CursorPaginator, decode_cursor)
+from .rows import as_feed_rows
+from .streaming import stream_feed_page
+from .visibility import get_feed_visibility
+
+
+class CachedObjectMixin():
+    """
+    Миксин для представлений с одним объектом: объект загружается из базы
+    не больше одного раза за запрос, повторные вызовы get_object
+    возвращают уже полученный экземпляр.
+    """
 
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
 
-class PostAuthorRequiredMixin():
+
+class PostAuthorRequiredMixin(CachedObjectMixin):
     """
     Миксин проверяет, что текущий пользователь является автором поста.
     Если пользователь не автор, перенаправляет на страницу детального
@@ -11,23 +47,22 @@ class PostAuthorRequiredMixin():
     """
 
     model = Post
+    queryset = Post.objects.select_related('author', 'location')
     template_name = 'blog/create.html'
     pk_url_kwarg = 'post_id'
 
     def dispatch(self, request, *args, **kwargs):
-        current_post = get_object_or_404(
-            Post.objects.select_related('author'),
-            pk=kwargs[self.pk_url_kwarg]
-        )
+        current_post = self.get_object()
         if not current_post.author == self.request.user:
             return redirect(current_post)
         return super().dispatch(request, *args, **kwargs)
 
 
-class CommentMixin():
+class CommentMixin(CachedObjectMixin):
     """Миксимн с переопределенными методами для комментариев."""
 
-    query_pk_and_slug = ('post_id', 'comment_id')
+    post_url_kwarg = 'post_id'
+    pk_url_kwarg = 'comment_id'
     template_name = 'blog/comment.html'
 
     def dispatch(self, request, *args, **kwargs):
@@ -36,10 +71,346 @@ class CommentMixin():
             return redirect(comment)
         return super().dispatch(request, *args, **kwargs)
 
-    def get_object(self):
-        post_id = self.kwargs.get(self.query_pk_and_slug[0])
-        comment_id = self.kwargs.get(self.query_pk_and_slug[1])
-        return get_object_or_404(
-            Comment,
-            id=comment_id,
-            post=post_id)
+    def get_queryset(self):
+        return Comment.objects.select_related('author').filter(
+            post=self.kwargs[self.post_url_kwarg])
+
+
+class CursorPaginationMixin():
+    """
+    Миксин для списков постов: при включённой настройке
+    POST_CURSOR_PAGINATION заменяет постраничную пагинацию с OFFSET
+    на курсорную по (pub_date, id). Курсор передаётся в параметре cursor.
+    """
+
+    cursor_pagination = settings.POST_CURSOR_PAGINATION
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.cursor_pagination:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
+class CachedCountMixin():
+    """
+    Миксин для списков постов: количество постов для постраничной
+    пагинации берётся из кеша. Ключ строится по областям из
+    get_page_cache_scopes и режиму из get_count_cache_mode, поэтому
+    события, сбрасывающие кеш страниц, сбрасывают и количество.
+    """
+
+    paginator_class = CachedCountPaginator
+
+    def get_count_cache_mode(self):
+        return ''
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset,
+            per_page,
+            cache_key=get_count_cache_key(
+                self.get_page_cache_scopes(), self.get_count_cache_mode()),
+            estimate_threshold=settings.POST_COUNT_ESTIMATE_THRESHOLD,
+            **kwargs
+        )
+
+
+class FeedRowsMixin():
+    """
+    Миксин для списков постов: при включённой настройке POST_FEED_ROWS
+    страница ленты состоит из лёгких строк PostRow вместо экземпляров
+    моделей Post, User, Category и Location.
+    """
+
+    feed_rows = settings.POST_FEED_ROWS
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.feed_rows:
+            queryset = as_feed_rows(queryset)
+        return super().paginate_queryset(queryset, page_size)
+
+
+class FeedCardsMixin():
+    """
+    Миксин для фрагментов лент: вместо полной страницы возвращает только
+    карточки следующей порции постов. Порции выбираются по курсору,
+    курсор следующей порции передаётся в заголовке X-Next-Cursor.
+    """
+
+    template_name = 'blog/includes/post_cards.html'
+    template_engine = settings.FEED_TEMPLATE_ENGINE
+    cursor_pagination = True
+    streaming = False
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        next_cursor = context['page_obj'].next_cursor
+        if next_cursor:
+            response['X-Next-Cursor'] = next_cursor
+        return response
+
+
+class ConditionalGetMixin():
+    """
+    Миксин добавляет к GET-ответам заголовки ETag и Last-Modified и отвечает
+    304 Not Modified, если страница у клиента не устарела. Валидаторы
+    строятся из версий содержимого get_content_versions, версии шаблонов
+    и данных пользователя без рендеринга страницы и основных запросов.
+    """
+
+    def get_content_versions(self):
+        """Моменты изменения содержимого страницы в наносекундах."""
+        return []
+
+    def _get_versions(self):
+        if not hasattr(self, '_versions'):
+            self._versions = [
+                get_templates_version(), *self.get_content_versions()]
+        return self._versions
+
+    def get_etag(self, request, *args, **kwargs):
+        user = request.user
+        csrf_cookie = None
+        if user.is_authenticated:
+            # Формы на страницах пользователя содержат CSRF-токен: cookie
+            # создаётся заранее, чтобы ETag не менялся после первого ответа.
+            get_token(request)
+            csrf_cookie = request.META['CSRF_COOKIE']
+        parts = (
+            self._get_versions(),
+            user.pk,
+            user.get_username(),
+            csrf_cookie,
+        )
+        return hashlib.md5(repr(parts).encode()).hexdigest()
+
+    def get_last_modified(self, request, *args, **kwargs):
+        versions = self._get_versions()
+        last_modified = datetime.fromtimestamp(
+            max(versions) / 10 ** 9, tz=timezone.utc)
+        last_login = getattr(request.user, 'last_login', None)
+        if last_login and last_login > last_modified:
+            return last_login
+        return last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        response = condition(
+            etag_func=self.get_etag,
+            last_modified_func=self.get_last_modified
+        )(super().dispatch)(request, *args, **kwargs)
+        if response.status_code not in (200, 304):
+            # Валидаторы описывают только страницу: иначе клиент получал
+            # бы 304 при повторе, например, ответа 503.
+            del response['ETag']
+            del response['Last-Modified']
+        return response
+
+
+class FeedConditionalGetMixin(ConditionalGetMixin):
+    """
+    Миксин для лент: содержимое меняется вместе с версиями областей
+    из get_page_cache_scopes и границей видимости постов.
+    """
+
+    def get_content_versions(self):
+        cutoff = get_feed_visibility().cutoff
+        return [
+            *get_scope_versions(self.get_page_cache_scopes()),
+            int(cutoff.timestamp()) * 10 ** 9,
+        ]
+
+
+class PostConditionalGetMixin(ConditionalGetMixin):
+    """
+    Миксин для страниц поста: содержимое меняется вместе с моментом
+    изменения поста в базе (его обновляют и изменения комментариев),
+    границей видимости постов (отложенный пост стал виден) и версией
+    области поста, которую сбрасывают изменения категорий,
+    местоположений и имён пользователей. Для несуществующих постов
+    версии в кеше не создаются.
+    """
+
+    def get_content_versions(self):
+        post_id = self.kwargs[self.pk_url_kwarg]
+        cutoff = get_feed_visibility().cutoff
+        versions = [int(cutoff.timestamp()) * 10 ** 9]
+        updated_at = Post.objects.filter(pk=post_id).values_list(
+            'updated_at', flat=True).first()
+        if updated_at is not None:
+            versions += [
+                int(updated_at.timestamp() * 10 ** 6) * 1000,
+                *get_scope_versions([post_scope(post_id)]),
+            ]
+        return versions
+
+
+class AnonymousPageCacheMixin():
+    """
+    Миксин кеширует страницы для анонимных пользователей. Ключ включает
+    адрес страницы и версии областей кеша из get_page_cache_scopes,
+    поэтому изменения постов сбрасывают только затронутые страницы.
+
+    После сброса страницу собирает только один запрос, взявший
+    блокировку; остальные получают последнюю собранную версию страницы
+    или ждут окончания сборки. Число одновременных сборок в процессе
+    ограничено PAGE_CACHE_MAX_REGENERATIONS: сверх лимита отдаётся
+    последняя собранная версия, а без неё запрос ждёт свободного места.
+    """
+
+    def get_page_cache_scopes(self):
+        return (GLOBAL_SCOPE,)
+
+    def uses_page_cache(self, request):
+        """Берётся ли ответ на запрос из кеша страниц."""
+        return (
+            request.method == 'GET'
+            and not request.user.is_authenticated
+            and bool(settings.PAGE_CACHE_TIMEOUT)
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.uses_page_cache(request):
+            return super().dispatch(request, *args, **kwargs)
+        key = get_page_cache_key(request, self.get_page_cache_scopes())
+        response = cache.get(key)
+        if response is None:
+            response = self.regenerate_page(key, request, *args, **kwargs)
+        return response
+
+    def get_busy_page(self, key):
+        """
+        Ответ, если место для сборки не освободилось за
+        PAGE_CACHE_WAIT_TIMEOUT: страница, собранная за это время другим
+        запросом, или 503 с предложением повторить запрос.
+        """
+        response = cache.get(key)
+        if response is None:
+            response = HttpResponse(status=503)
+            response['Retry-After'] = max(
+                1, int(settings.PAGE_CACHE_WAIT_TIMEOUT))
+        return response
+
+    def build_page(self, key, stale_key, request, *args, **kwargs):
+        """
+        Собирает страницу и сохраняет успешный ответ в кеш. Если страница
+        больше не отдаётся с кодом 200 (например, категорию сняли
+        с публикации), её последняя собранная версия удаляется.
+        """
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        except Exception:
+            cache.delete(stale_key)
+            raise
+        if response.status_code == 200:
+            cache_page_response(key, response, stale_key)
+        else:
+            cache.delete(stale_key)
+        return response
+
+    def regenerate_page(self, key, request, *args, **kwargs):
+        """
+        Собирает страницу после промаха кеша. Блокировка берётся в общем
+        кеше, поэтому страницу собирает один запрос на все процессы.
+        """
+        stale_key = get_stale_page_cache_key(request)
+        stale_response = cache.get(stale_key)
+        lock_key = f'{key}:lock'
+        shared_cache = get_shared_cache()
+        locked = shared_cache.add(
+            lock_key, True, settings.PAGE_CACHE_LOCK_TIMEOUT)
+        if not locked:
+            if stale_response is not None:
+                return stale_response
+            response = wait_for_cache(key, settings.PAGE_CACHE_WAIT_TIMEOUT)
+            if response is not None:
+                return response
+        try:
+            # Лимит сборок ограничивает только страницы, которые есть чем
+            # заменить; без последней версии запрос ждёт свободного места.
+            if stale_response is not None:
+                if not page_regeneration_slots.acquire(blocking=False):
+                    return stale_response
+            elif not page_regeneration_slots.acquire(
+                    timeout=settings.PAGE_CACHE_WAIT_TIMEOUT):
+                return self.get_busy_page(key)
+            try:
+                return self.build_page(
+                    key, stale_key, request, *args, **kwargs)
+            finally:
+                page_regeneration_slots.release()
+        finally:
+            if locked:
+                shared_cache.delete(lock_key)
+
+
+class StreamingFeedMixin():
+    """
+    Миксин для лент: при включённой настройке POST_STREAMING_FEEDS страница
+    отдаётся потоком. Начало документа и шапка выводятся до запросов
+    к постам, карточки — порциями по мере загрузки строк. Ответы из кеша
+    страниц (uses_page_cache) по-прежнему собираются целиком.
+    """
+
+    streaming = settings.POST_STREAMING_FEEDS
+
+    def should_stream(self, request):
+        return self.streaming and not self.uses_page_cache(request)
+
+    def get_paginate_by(self, queryset):
+        if getattr(self, 'rendering_shell', False):
+            return None
+        return super().get_paginate_by(queryset)
+
+    def render_shell(self):
+        """
+        Рендерит страницу без пагинации: вместо шаблонов лент в ней
+        остаются метки, которые заполняет stream_feed_page.
+        """
+        self.rendering_shell = True
+        try:
+            context = self.get_context_data(streaming=True)
+        finally:
+            self.rendering_shell = False
+        return render_to_string(
+            self.get_template_names(), context, request=self.request)
+
+    def validate_page(self):
+        """
+        Проверяет курсор или номер страницы до отправки заголовков, чтобы
+        несуществующая страница, как и без потоковой выдачи, давала 404.
+        Номер проверяется по количеству постов из кеша, страница при этом
+        запоминается. Первая страница существует всегда, её посты
+        выбираются уже после отправки начала документа.
+        """
+        self.streamed_page = None
+        if getattr(self, 'cursor_pagination', False):
+            cursor = self.request.GET.get(self.cursor_kwarg)
+            if cursor:
+                decode_cursor(cursor)
+            return
+        page = (self.kwargs.get(self.page_kwarg)
+                or self.request.GET.get(self.page_kwarg) or 1)
+        if str(page) != '1':
+            self.streamed_page = self.get_page()
+
+    def get_page(self):
+        """Страница ленты для потоковой выдачи."""
+        if self.streamed_page is None:
+            _, self.streamed_page, _, _ = self.paginate_queryset(
+                self.object_list, self.get_paginate_by(self.object_list))
+        return self.streamed_page
+
+    def get(self, request, *args, **kwargs):
+        if not self.should_stream(request):
+            return super().get(request, *args, **kwargs)
+        self.object_list = self.get_queryset()
+        self.validate_page()
+        return StreamingHttpResponse(
+            stream_feed_page(self.render_shell(), self.get_page))
@@ -1,6 +1,13 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.dispatch import Signal
+from django.template.defaultfilters import linebreaksbr
 from django.urls import reverse
+from django.utils.text import Truncator
 
 
 # Допустимая длина для полей-строк в моделях.
@@ -9,8 +16,34 @@ CHARFIELD_MAX_LENGTH = 256
 # Длина строки для отображения в админ-панели.
 LIMIT_STRING_DISPLAYED = 16
 
+# Количество слов текста поста, выводимых в карточке поста.
+POST_EXCERPT_WORDS = 10
+
+# Максимальная длина анонса поста.
+POST_EXCERPT_MAX_LENGTH = 512
+
 User = get_user_model()
 
+# Отправляется после массового удаления комментариев с числом удалённых
+# комментариев каждого поста: counts = {post_id: количество}.
+comments_deleted = Signal()
+
+# Состояние удаления комментариев в текущем потоке.
+comment_deletion = threading.local()
+
+
+@contextmanager
+def grouped_comment_deletion():
+    """
+    На время массового удаления отключает пересчёт счётчика
+    комментариев на каждый удаляемый комментарий.
+    """
+    comment_deletion.grouped = True
+    try:
+        yield
+    finally:
+        comment_deletion.grouped = False
+
 
 class BaseModel(models.Model):
     """Абстрактная базовая модель, содержащая общие поля для всех моделей."""
@@ -71,6 +104,17 @@ class Post(BaseModel):
         max_length=CHARFIELD_MAX_LENGTH,
         verbose_name='Заголовок')
     text = models.TextField(verbose_name='Текст')
+    excerpt = models.CharField(
+        max_length=POST_EXCERPT_MAX_LENGTH,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Анонс')
+    body_html = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Текст в HTML')
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text=('Если установить дату и время в будущем — можно '
@@ -79,6 +123,7 @@ class Post(BaseModel):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Автор публикации')
     location = models.ForeignKey(
         Location,
@@ -90,25 +135,100 @@ class Post(BaseModel):
         Category,
         on_delete=models.SET_NULL,
         null=True,
+        db_index=False,
         verbose_name='Категория')
     image = models.ImageField(
         verbose_name='Фото',
         upload_to='posts_images',
         blank=True,
         null=True,)
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев')
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено')
+    # Пересчитывается в save(), при загрузке фикстур и при изменении
+    # категории; после bulk_create и update() нужна команда
+    # recompute_post_visibility.
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Виден в лентах',
+        help_text=('Пост и его категория опубликованы. Пересчитывается '
+                   'автоматически.'))
 
     class Meta:
         verbose_name = 'пост'
         verbose_name_plural = 'Посты'
         default_related_name = 'posts'
+        # Индексы повторяют фильтры и сортировку лент постов, поэтому
+        # отдельные индексы по author и category не нужны.
+        indexes = (
+            models.Index(
+                fields=('is_visible', '-pub_date', '-id'),
+                name='post_visible_pub_date_idx'),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_pub_date_idx'),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx'),
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_feed_pub_date_idx',
+                condition=models.Q(is_visible=True)),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                name='post_feed_category_idx',
+                condition=models.Q(is_visible=True)),
+        )
 
     def __str__(self):
         return self.title[:LIMIT_STRING_DISPLAYED]
 
+    def render_text(self):
+        """Пересчитывает анонс и HTML-представление текста поста."""
+        self.excerpt = Truncator(
+            Truncator(self.text).words(POST_EXCERPT_WORDS, truncate=' …')
+        ).chars(POST_EXCERPT_MAX_LENGTH)
+        self.body_html = linebreaksbr(self.text)
+
+    def save(self, *args, **kwargs):
+        self.is_visible = bool(
+            self.is_published
+            and self.category
+            and self.category.is_published)
+        self.render_text()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {
+                *update_fields, 'is_visible', 'excerpt', 'body_html'}
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'post_id': self.pk})
 
 
+class CommentQuerySet(models.QuerySet):
+
+    def delete(self):
+        """
+        Удаляет комментарии, а счётчики их постов уменьшает одним
+        запросом на пост через сигнал comments_deleted.
+        """
+        counts = Counter(self.order_by().values_list('post_id', flat=True))
+        with grouped_comment_deletion():
+            result = super().delete()
+        if counts:
+            comments_deleted.send(sender=Comment, counts=counts)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Comment(models.Model):
     created_at = models.DateTimeField(
         auto_now_add=True,
@@ -122,18 +242,26 @@ class Comment(models.Model):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Пост'
     )
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx'),
+        )
 
     def __str__(self):
         return (f'Комментарий от {self.author.username} '
                 f'к посту {self.post.title[:LIMIT_STRING_DISPLAYED]}')
 
     def get_absolute_url(self):
-        return reverse('blog:post_detail', kwargs={'post_id': self.post.pk})
+        return reverse('blog:post_detail', kwargs={'post_id': self.post_id})
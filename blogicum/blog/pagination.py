@@ -0,0 +1,194 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+# Направления перехода по курсору.
+CURSOR_NEXT = 'n'
+CURSOR_PREVIOUS = 'p'
+
+
+def encode_cursor(direction, moment, pk):
+    """Кодирует позицию (дата, id) и направление в непрозрачную строку."""
+    raw = json.dumps([direction, moment.isoformat(), pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Раскодирует курсор, созданный encode_cursor.
+    При некорректном курсоре вызывает Http404.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, moment, pk = json.loads(
+            base64.urlsafe_b64decode(padded.encode()))
+        moment = parse_datetime(moment)
+        pk = int(pk)
+    except (binascii.Error, TypeError, ValueError):
+        raise Http404('Некорректный курсор.')
+    if moment is None or direction not in (CURSOR_NEXT, CURSOR_PREVIOUS):
+        raise Http404('Некорректный курсор.')
+    return direction, moment, pk
+
+
+class CursorPage:
+    """Страница курсорной пагинации с интерфейсом, похожим на Page."""
+
+    cursor_mode = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.get_cursor(CURSOR_NEXT, self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.get_cursor(
+            CURSOR_PREVIOUS, self.object_list[0])
+
+
+class CursorPaginator:
+    """
+    Курсорная (keyset) пагинация по паре полей (дата, id) в порядке
+    «от новых к старым». Стоимость любой страницы не зависит от её номера:
+    запрос всегда читает не больше per_page + 1 строк по индексу и не
+    выполняет COUNT.
+    """
+
+    def __init__(self, queryset, per_page, date_field='pub_date',
+                 descending=True):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.date_field = date_field
+        self.descending = descending
+
+    def get_cursor(self, direction, obj):
+        return encode_cursor(
+            direction, getattr(obj, self.date_field), obj.pk)
+
+    def _after(self, moment, pk, forward):
+        """Условие «строго после позиции» в выбранном направлении."""
+        lookup = 'lt' if forward == self.descending else 'gt'
+        return (
+            Q(**{f'{self.date_field}__{lookup}': moment})
+            | Q(**{self.date_field: moment, f'pk__{lookup}': pk})
+        )
+
+    def _ordering(self, forward):
+        prefix = '-' if forward == self.descending else ''
+        return f'{prefix}{self.date_field}', f'{prefix}pk'
+
+    def page(self, cursor=None):
+        """Возвращает страницу, начинающуюся после переданного курсора."""
+        forward = True
+        queryset = self.queryset
+        if cursor:
+            direction, moment, pk = decode_cursor(cursor)
+            forward = direction == CURSOR_NEXT
+            queryset = queryset.filter(self._after(moment, pk, forward))
+        rows = list(
+            queryset.order_by(*self._ordering(forward))[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if forward:
+            return CursorPage(
+                rows, self, has_next=has_more, has_previous=bool(cursor))
+        rows.reverse()
+        return CursorPage(rows, self, has_next=True, has_previous=has_more)
+
+
+def estimate_count(queryset):
+    """
+    Оценивает количество строк запроса по плану PostgreSQL без COUNT.
+    Для других СУБД возвращает None.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class FeedPage(Page):
+    """Страница ленты с сокращённым списком номеров страниц."""
+
+    @property
+    def elided_page_range(self):
+        """
+        Номера страниц вокруг текущей и по краям, пропуски заменены
+        на многоточие. Размер списка не зависит от числа страниц.
+        """
+        return self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=settings.POST_PAGE_RANGE_ON_EACH_SIDE,
+            on_ends=settings.POST_PAGE_RANGE_ON_ENDS
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Постраничный пагинатор, запоминающий количество объектов в кеше
+    по ключу cache_key. Если задан estimate_threshold, для выборок
+    не меньше этого размера вместо COUNT используется оценка СУБД.
+    """
+
+    def __init__(self, object_list, per_page, cache_key=None,
+                 estimate_threshold=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.estimate_threshold = estimate_threshold
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+    def _count(self):
+        if self.estimate_threshold is not None:
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return self.object_list.count()
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return self._count()
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = self._count()
+            cache.set(self.cache_key, count, settings.POST_COUNT_CACHE_TIMEOUT)
+        return count
@@ -0,0 +1,55 @@
+import re
+from urllib.parse import parse_qsl, urlencode
+
+from django.template import Context, engines
+from django.utils.safestring import mark_safe
+
+# Фрагменты страниц, зависящие от пользователя. Шаблоны фрагментов
+# получают только целочисленные параметры, пользователя, запрос и
+# переданный представлением дополнительный контекст, поэтому одинаково
+# рендерятся и внутри страницы, и отдельным проходом поверх общей копии.
+PERSONAL_FRAGMENTS = {
+    'header': 'includes/header.html',
+    'post_actions': 'blog/includes/post_actions.html',
+    'comment_form': 'includes/comment_form.html',
+    'comment_actions': 'includes/comment_actions.html',
+}
+
+PLACEHOLDER_RE = re.compile(r'<!--esi:(?P<name>\w+)\?(?P<params>[\w=&]*)-->')
+
+
+def get_placeholder(name, params):
+    """Метка на месте персонального фрагмента в общей копии страницы."""
+    return mark_safe(f'<!--esi:{name}?{urlencode(params)}-->')
+
+
+def render_personal_fragment(name, context, params):
+    """Рендерит персональный фрагмент в переданном контексте шаблона."""
+    engine = engines['django'].engine
+    template = engine.get_template(PERSONAL_FRAGMENTS[name])
+    with context.push(**params):
+        return template.render(context)
+
+
+def fill_personal_fragments(html, request, extra_context=None):
+    """
+    Заменяет метки в общей копии страницы фрагментами для пользователя
+    из request. Контекстные процессоры выполняются один раз на страницу.
+    """
+    engine = engines['django'].engine
+    context = Context(autoescape=engine.autoescape)
+    for processor in engine.template_context_processors:
+        context.update(processor(request))
+    context.update(extra_context or {})
+
+    def replace(match):
+        name = match['name']
+        if name not in PERSONAL_FRAGMENTS:
+            return match[0]
+        params = {
+            key: int(value)
+            for key, value in parse_qsl(match['params'])
+        }
+        return render_personal_fragment(name, context, params)
+
+    return PLACEHOLDER_RE.sub(replace, html)
@@ -0,0 +1,117 @@
+import re
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.urls import get_resolver, get_script_prefix, get_urlconf, reverse
+from django.urls.resolvers import get_ns_resolver
+from django.utils.http import RFC3986_SUBDELIMS, escape_leading_slashes
+
+# Пространства имён, для адресов которых заранее строятся шаблоны URL.
+URL_TEMPLATE_NAMESPACES = ('blog',)
+
+URL_SAFE_CHARS = RFC3986_SUBDELIMS + '/~:@'
+
+
+class URLTemplate:
+    """
+    Шаблон адреса одного маршрута: строка подстановки из резолвера и
+    конвертеры параметров с регулярными выражениями для их проверки.
+    """
+
+    __slots__ = ('template', 'params')
+
+    def __init__(self, template, params):
+        self.template = template
+        self.params = params
+
+    def expand(self, prefix, args):
+        """
+        Подставляет позиционные аргументы. Возвращает None, если
+        аргументы не подходят маршруту: тогда решение за reverse().
+        """
+        if len(args) != len(self.params):
+            return None
+        subs = {}
+        for value, (name, converter, regex) in zip(args, self.params):
+            try:
+                text = str(converter.to_url(value))
+            except ValueError:
+                return None
+            if not regex.fullmatch(text):
+                return None
+            subs[name] = text
+        return escape_leading_slashes(
+            quote(prefix + self.template % subs, safe=URL_SAFE_CHARS))
+
+
+def build_url_template(possibilities):
+    """
+    Шаблон для маршрута с единственным вариантом, у которого все
+    параметры заданы конвертерами path(). Для прочих маршрутов None.
+    """
+    if len(possibilities) != 1:
+        return None
+    possibility, pattern, defaults, converters = possibilities[0]
+    if len(possibility) != 1 or defaults:
+        return None
+    template, params = possibility[0]
+    if not set(params) <= set(converters):
+        return None
+    return URLTemplate(template, tuple(
+        (name, converters[name], re.compile(converters[name].regex))
+        for name in params
+    ))
+
+
+@lru_cache(maxsize=None)
+def get_url_templates(urlconf=None):
+    """Шаблоны адресов именованных маршрутов из URL_TEMPLATE_NAMESPACES."""
+    root = get_resolver(urlconf)
+    url_templates = {}
+    for namespace in URL_TEMPLATE_NAMESPACES:
+        extra, resolver = root.namespace_dict[namespace]
+        if extra:
+            resolver = get_ns_resolver(
+                extra, resolver, tuple(resolver.pattern.converters.items()))
+        for name in resolver.reverse_dict:
+            if not isinstance(name, str):
+                continue
+            url_template = build_url_template(
+                resolver.reverse_dict.getlist(name))
+            if url_template is not None:
+                url_templates[f'{namespace}:{name}'] = url_template
+    return url_templates
+
+
+@lru_cache(maxsize=None)
+def reverse_without_args(viewname, urlconf, prefix):
+    """Адреса маршрутов без параметров не меняются между запросами."""
+    return reverse(viewname, urlconf=urlconf)
+
+
+def fast_reverse(viewname, *args):
+    """
+    Аналог reverse() с позиционными аргументами для шаблонов: адрес
+    собирается по готовому шаблону без обхода резолвера. Если шаблона нет
+    или аргументы не прошли проверку, адрес строит reverse().
+    """
+    urlconf = get_urlconf()
+    prefix = get_script_prefix()
+    if not args:
+        return reverse_without_args(viewname, urlconf, prefix)
+    url_template = get_url_templates(urlconf).get(viewname)
+    if url_template is not None:
+        url = url_template.expand(prefix, args)
+        if url is not None:
+            return url
+    return reverse(viewname, urlconf=urlconf, args=args)
+
+
+@receiver(setting_changed)
+def clear_url_templates(setting, **kwargs):
+    """Сбрасывает готовые адреса при подмене ROOT_URLCONF в тестах."""
+    if setting == 'ROOT_URLCONF':
+        get_url_templates.cache_clear()
+        reverse_without_args.cache_clear()
@@ -0,0 +1,149 @@
+from django.db.models.query import ValuesListIterable
+
+from .models import Post
+
+# Поля, из которых строятся строки ленты. Порядок важен: build_post_row
+# разбирает кортежи значений по позициям.
+FEED_ROW_FIELDS = (
+    'id',
+    'title',
+    'excerpt',
+    'pub_date',
+    'updated_at',
+    'image',
+    'is_published',
+    'comment_count',
+    'author_id',
+    'author__username',
+    'category_id',
+    'category__slug',
+    'category__title',
+    'category__is_published',
+    'location_id',
+    'location__name',
+    'location__is_published',
+)
+
+
+class ImageRow:
+    """Изображение поста: имя файла и его адрес в хранилище."""
+
+    __slots__ = ('name',)
+
+    storage = Post._meta.get_field('image').storage
+
+    def __init__(self, name):
+        self.name = name
+
+    def __bool__(self):
+        return bool(self.name)
+
+    @property
+    def url(self):
+        return self.storage.url(self.name)
+
+
+class AuthorRow:
+    """Автор поста в строке ленты."""
+
+    __slots__ = ('id', 'username')
+
+    def __init__(self, id, username):
+        self.id = id
+        self.username = username
+
+
+class CategoryRow:
+    """Категория поста в строке ленты."""
+
+    __slots__ = ('id', 'slug', 'title', 'is_published')
+
+    def __init__(self, id, slug, title, is_published):
+        self.id = id
+        self.slug = slug
+        self.title = title
+        self.is_published = is_published
+
+
+class LocationRow:
+    """Местоположение поста в строке ленты."""
+
+    __slots__ = ('id', 'name', 'is_published')
+
+    def __init__(self, id, name, is_published):
+        self.id = id
+        self.name = name
+        self.is_published = is_published
+
+
+class PostRow:
+    """
+    Лёгкая замена экземпляра Post для вывода в ленте: только поля,
+    которые используют post_card.html, ключ кеша карточки и пагинаторы.
+    """
+
+    __slots__ = (
+        'id', 'title', 'excerpt', 'pub_date', 'updated_at', 'image',
+        'is_published', 'comment_count', 'author', 'category', 'location',
+    )
+
+    def __init__(self, id, title, excerpt, pub_date, updated_at, image,
+                 is_published, comment_count, author, category, location):
+        self.id = id
+        self.title = title
+        self.excerpt = excerpt
+        self.pub_date = pub_date
+        self.updated_at = updated_at
+        self.image = image
+        self.is_published = is_published
+        self.comment_count = comment_count
+        self.author = author
+        self.category = category
+        self.location = location
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __repr__(self):
+        return f'<PostRow: {self.id}>'
+
+
+def build_post_row(values):
+    """Собирает PostRow из кортежа значений в порядке FEED_ROW_FIELDS."""
+    (id, title, excerpt, pub_date, updated_at, image, is_published,
+     comment_count, author_id, author_username, category_id, category_slug,
+     category_title, category_is_published, location_id, location_name,
+     location_is_published) = values
+    category = location = None
+    if category_id is not None:
+        category = CategoryRow(
+            category_id, category_slug, category_title,
+            category_is_published)
+    if location_id is not None:
+        location = LocationRow(
+            location_id, location_name, location_is_published)
+    return PostRow(
+        id, title, excerpt, pub_date, updated_at, ImageRow(image),
+        is_published, comment_count,
+        AuthorRow(author_id, author_username), category, location)
+
+
+class FeedRowIterable(ValuesListIterable):
+    """Итератор запроса, возвращающий PostRow вместо кортежей."""
+
+    def __iter__(self):
+        for values in super().__iter__():
+            yield build_post_row(values)
+
+
+def as_feed_rows(queryset):
+    """
+    Превращает запрос постов в запрос строк ленты. Результат остаётся
+    QuerySet: его можно фильтровать, сортировать, считать и нарезать,
+    поэтому он подходит обоим пагинаторам, но вместо моделей с их
+    состоянием и дескрипторами связей создаёт компактные PostRow.
+    """
+    rows = queryset.values_list(*FEED_ROW_FIELDS)
+    rows._iterable_class = FeedRowIterable
+    return rows
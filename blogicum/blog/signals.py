@@ -0,0 +1,269 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import (
+    FORM_CHOICES_SCOPE, author_lookup_cache, author_scope, bump_scopes,
+    category_lookup_cache, category_scope, get_post_scopes, get_posts_scopes,
+    post_scope)
+from .models import (
+    Category, Comment, Location, Post, comment_deletion, comments_deleted)
+from .visibility import reset_feed_visibility
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    """
+    Увеличивает счётчик комментариев поста при добавлении комментария.
+    При редактировании комментария сбрасывает только страницу поста.
+    В обоих случаях обновляет момент изменения поста: по нему строятся
+    ETag и Last-Modified страницы поста.
+    """
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1,
+            updated_at=timezone.now())
+        bump_scopes(get_post_scopes(instance.post_id))
+    else:
+        Post.objects.filter(pk=instance.post_id).update(
+            updated_at=timezone.now())
+        bump_scopes({post_scope(instance.post_id)})
+
+
+def get_deleted_post_ids():
+    """Посты, удаляемые в текущем потоке вместе с их комментариями."""
+    if not hasattr(comment_deletion, 'post_ids'):
+        comment_deletion.post_ids = set()
+    return comment_deletion.post_ids
+
+
+def get_deleted_author_counts():
+    """
+    Число комментариев к чужим постам у пользователей, удаляемых
+    в текущем потоке: {id пользователя: {id поста: количество}}.
+    """
+    if not hasattr(comment_deletion, 'author_counts'):
+        comment_deletion.author_counts = {}
+    return comment_deletion.author_counts
+
+
+@receiver(comments_deleted, sender=Comment)
+def decrease_comment_counts(sender, counts, **kwargs):
+    """
+    Уменьшает счётчики комментариев постов на число удалённых
+    комментариев: один запрос на пост и один сброс кеша на всё удаление.
+    """
+    now = timezone.now()
+    for post_id, count in counts.items():
+        Post.objects.filter(pk=post_id).update(
+            comment_count=Greatest(F('comment_count') - count, 0),
+            updated_at=now)
+    bump_scopes(get_posts_scopes(Post.objects.filter(pk__in=counts)))
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """
+    Уменьшает счётчик комментариев поста при удалении одного комментария.
+    Комментарии удаляемого поста не пересчитываются, а при массовом
+    удалении и удалении автора счётчики уменьшаются сразу на весь пост.
+    """
+    if (getattr(comment_deletion, 'grouped', False)
+            or instance.post_id in get_deleted_post_ids()
+            or instance.author_id in get_deleted_author_counts()):
+        return
+    decrease_comment_counts(sender, {instance.post_id: 1})
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post(sender, instance, **kwargs):
+    """Отмечает пост, комментарии которого удаляются вместе с ним."""
+    get_deleted_post_ids().add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleted_post(sender, instance, **kwargs):
+    """Снимает отметку с удалённого поста."""
+    get_deleted_post_ids().discard(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def remember_deleted_author(sender, instance, **kwargs):
+    """
+    Запоминает, сколько комментариев удаляемый пользователь оставил
+    к чужим постам: его собственные посты удаляются вместе с ним.
+    """
+    get_deleted_author_counts()[instance.pk] = Counter(dict(
+        Comment.objects.filter(author=instance).exclude(
+            post__author=instance
+        ).order_by().values('post').annotate(
+            total=Count('pk')).values_list('post', 'total')))
+
+
+@receiver(post_delete, sender=User)
+def decrease_deleted_author_counts(sender, instance, **kwargs):
+    """Уменьшает счётчики постов с комментариями удалённого пользователя."""
+    counts = get_deleted_author_counts().pop(instance.pk, None)
+    if counts:
+        decrease_comment_counts(Comment, counts)
+
+
+@receiver(pre_save, sender=Post)
+def prepare_raw_post(sender, instance, raw=False, **kwargs):
+    """
+    Заполняет анонс, HTML текста, флаг видимости и момент изменения у
+    постов, сохраняемых без Post.save: например, при загрузке фикстур
+    командой loaddata. Категория проверяется запросом, так как при raw
+    связанные объекты не загружаются.
+    """
+    if raw:
+        instance.render_text()
+        instance.is_visible = bool(
+            instance.is_published
+            and instance.category_id is not None
+            and Category.objects.filter(
+                pk=instance.category_id, is_published=True).exists())
+        if instance.updated_at is None:
+            instance.updated_at = timezone.now()
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_scopes(sender, instance, **kwargs):
+    """
+    Запоминает области кеша, где пост отображался до изменения:
+    при смене категории или удалении нужно сбросить и их.
+    """
+    instance._cache_scopes = (
+        get_post_scopes(instance.pk) if instance.pk else set())
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    """
+    Сбрасывает кеш страниц, где отображается пост, и границу видимости:
+    пост мог стать новой отложенной или уже видимой публикацией.
+    """
+    scopes = getattr(instance, '_cache_scopes', set())
+    if kwargs.get('signal') is post_save:
+        scopes |= get_post_scopes(instance.pk)
+    bump_scopes(scopes)
+    reset_feed_visibility()
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_state(sender, instance, **kwargs):
+    """
+    Запоминает прежние slug и статус публикации категории, чтобы сбросить
+    её старую страницу и пересчитать видимость постов.
+    """
+    old_state = None
+    if instance.pk:
+        old_state = Category.objects.filter(pk=instance.pk).values_list(
+            'slug', 'is_published').first()
+    instance._old_slug, instance._old_is_published = old_state or (None, None)
+
+
+@receiver(post_save, sender=Category)
+def update_category_posts_visibility(sender, instance, **kwargs):
+    """
+    Пересчитывает видимость постов одним запросом, если категорию сняли
+    с публикации или опубликовали снова (в том числе из списка категорий
+    в админ-панели).
+    """
+    if instance.is_published == getattr(instance, '_old_is_published', None):
+        return
+    posts = Post.objects.filter(category=instance)
+    if instance.is_published:
+        posts.update(is_visible=F('is_published'))
+    else:
+        posts.update(is_visible=False)
+    reset_feed_visibility()
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    """Скрывает посты удаляемой категории: у них не останется категории."""
+    instance.posts.update(is_visible=False)
+    reset_feed_visibility()
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def invalidate_category_pages(sender, instance, **kwargs):
+    """Сбрасывает кеш страниц с постами категории."""
+    scopes = get_posts_scopes(instance.posts.all())
+    scopes.add(category_scope(instance.slug))
+    old_slug = getattr(instance, '_old_slug', None)
+    if old_slug:
+        scopes.add(category_scope(old_slug))
+    bump_scopes(scopes)
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def invalidate_location_pages(sender, instance, **kwargs):
+    """Сбрасывает кеш страниц с постами, привязанными к местоположению."""
+    bump_scopes(get_posts_scopes(instance.posts.all()))
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, **kwargs):
+    """Запоминает прежнее имя пользователя."""
+    instance._old_username = None
+    if instance.pk and update_fields != frozenset(('last_login',)):
+        instance._old_username = User.objects.filter(
+            pk=instance.pk).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_pages(sender, instance, update_fields=None, **kwargs):
+    """
+    Сбрасывает кеш страницы пользователя. При смене имени сбрасываются
+    и все страницы с его постами, так как имя выводится в карточках.
+    """
+    if update_fields == frozenset(('last_login',)):
+        return
+    scopes = {author_scope(instance.username)}
+    old_username = getattr(instance, '_old_username', None)
+    if old_username and old_username != instance.username:
+        scopes.add(author_scope(old_username))
+        scopes |= get_posts_scopes(instance.posts.all())
+        scopes |= {
+            post_scope(pk) for pk in Post.objects.filter(
+                comments__author=instance).values_list('pk', flat=True)}
+    bump_scopes(scopes)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def forget_category(sender, instance, **kwargs):
+    """Удаляет категорию из кеша в памяти процесса."""
+    category_lookup_cache.delete(
+        instance.slug, getattr(instance, '_old_slug', None))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_author(sender, instance, **kwargs):
+    """Удаляет пользователя из кеша в памяти процесса."""
+    author_lookup_cache.delete(
+        instance.username, getattr(instance, '_old_username', None))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_form_choices(sender, instance, **kwargs):
+    """Сбрасывает разметку форм со списками категорий и местоположений."""
+    bump_scopes({FORM_CHOICES_SCOPE})
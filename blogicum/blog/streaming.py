@@ -0,0 +1,62 @@
+import re
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+# Шаблоны лент, которые перебирают page_obj и могут выводиться по частям.
+CHUNKED_FEED_TEMPLATES = {'blog/includes/post_cards.html'}
+
+PLACEHOLDER_RE = re.compile(r'<!--stream:(?P<name>[\w./-]+)-->')
+
+
+def get_placeholder(template_name):
+    """Метка на месте шаблона ленты в общей части страницы."""
+    return mark_safe(f'<!--stream:{template_name}-->')
+
+
+def iter_chunks(object_list, chunk_size):
+    """
+    Делит объекты страницы на порции. Запрос выполняется курсором, так что
+    первая порция выводится, не дожидаясь загрузки всех строк.
+    """
+    if isinstance(object_list, QuerySet):
+        object_list = object_list.iterator(chunk_size=chunk_size)
+    iterator = iter(object_list)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def render_feed_template(template_name, page_obj):
+    """Рендерит шаблон ленты целиком или по порциям объектов страницы."""
+    if template_name not in CHUNKED_FEED_TEMPLATES:
+        yield render_to_string(
+            template_name, {'page_obj': page_obj},
+            using=settings.FEED_TEMPLATE_ENGINE)
+        return
+    for chunk in iter_chunks(
+            page_obj.object_list, settings.POST_STREAM_CHUNK_SIZE):
+        yield render_to_string(
+            template_name, {'page_obj': chunk},
+            using=settings.FEED_TEMPLATE_ENGINE)
+
+
+def stream_feed_page(shell, get_page):
+    """
+    Отдаёт страницу ленты по частям. Текст до первой метки выводится до
+    запросов к постам, затем get_page() выбирает страницу ленты, и на
+    местах меток выводятся её шаблоны.
+    """
+    parts = PLACEHOLDER_RE.split(shell)
+    yield parts[0]
+    if len(parts) == 1:
+        return
+    page_obj = get_page()
+    for index in range(1, len(parts), 2):
+        yield from render_feed_template(parts[index], page_obj)
+        yield parts[index + 1]
@@ -0,0 +1,62 @@
+from django import template
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.cache import render_form, render_post_cards
+from blog.personalization import get_placeholder, render_personal_fragment
+from blog.routing import fast_reverse
+from blog.streaming import get_placeholder as get_stream_placeholder
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Возвращает список HTML карточек постов из кеша фрагментов."""
+    return render_post_cards(list(posts))
+
+
+@register.simple_tag(takes_context=True)
+def personal(context, name, **params):
+    """
+    Выводит фрагмент, зависящий от пользователя. При рендеринге общей
+    копии страницы (shared_shell в контексте) вместо него выводится метка,
+    которую заполняет fill_personal_fragments.
+    """
+    if context.get('shared_shell'):
+        return get_placeholder(name, params)
+    return render_personal_fragment(name, context, params)
+
+
+@register.simple_tag(takes_context=True)
+def feed_template(context, template_name, **template_context):
+    """
+    Рендерит шаблон лент с переданным контекстом движком
+    FEED_TEMPLATE_ENGINE: шаблонами Django или их версиями на Jinja2.
+    При потоковой выдаче страницы (streaming в контексте) вместо него
+    выводится метка, которую заполняет stream_feed_page.
+    """
+    if context.get('streaming'):
+        return get_stream_placeholder(template_name)
+    return mark_safe(render_to_string(
+        template_name, template_context,
+        using=settings.FEED_TEMPLATE_ENGINE))
+
+
+@register.simple_tag
+def fast_url(viewname, *args):
+    """
+    Аналог тега {% url %} с позиционными аргументами: адреса блога
+    собираются по заранее построенным шаблонам без обхода резолвера.
+    """
+    return fast_reverse(viewname, *args)
+
+
+@register.simple_tag
+def prerendered_form(form):
+    """
+    Выводит поля формы и кнопку отправки. Разметка пустой формы берётся
+    из кеша процесса, токен CSRF выводится в шаблоне отдельно.
+    """
+    return render_form(form)
@@ -18,6 +18,9 @@ posts_urls = [
     path('<int:post_id>/delete/',
          views.PostDeleteView.as_view(),
          name='delete_post'),
+    path('<int:post_id>/comments/',
+         views.PostCommentsView.as_view(),
+         name='post_comments'),
     path('<int:post_id>/comment/',
          views.CommentCreateView.as_view(),
          name='add_comment'),
@@ -33,13 +36,22 @@ urlpatterns = [
     path('',
          views.PostListView.as_view(),
          name='index'),
+    path('cards/',
+         views.PostCardsView.as_view(),
+         name='index_cards'),
     path('posts/', include(posts_urls)),
     path('category/<slug:category_slug>/',
          views.CategoryPostsListView.as_view(),
          name='category_posts'),
+    path('category/<slug:category_slug>/cards/',
+         views.CategoryPostCardsView.as_view(),
+         name='category_cards'),
     path('profile/<username>/',
          views.ProfileListView.as_view(),
          name='profile'),
+    path('profile/<username>/cards/',
+         views.ProfilePostCardsView.as_view(),
+         name='profile_cards'),
     path('personal/edit/',
          views.ProfileUpdateView.as_view(),
          name='edit_profile'),
@@ -1,31 +1,120 @@
-from django.db.models import Count, Manager
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Manager, Q
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
-from .models import Post
+from .cache import author_lookup_cache, category_lookup_cache
+from .models import Category, Post
+from .pagination import CursorPaginator
+from .visibility import get_feed_visibility
+
+# Поля постов и связанных моделей, которые выводятся в карточке поста.
+FEED_POST_FIELDS = (
+    'title',
+    'excerpt',
+    'pub_date',
+    'image',
+    'is_published',
+    'comment_count',
+    'updated_at',
+    'author',
+    'author__username',
+    'category',
+    'category__slug',
+    'category__title',
+    'category__is_published',
+    'location',
+    'location__name',
+    'location__is_published',
+)
 
 
 def get_queryset_posts(
         manager: Manager = Post.objects,
-        add_annotate=True,
-        add_filters=True):
-    """Получает список постов по заданным параметрам."""
+        add_ordering=True,
+        add_filters=True,
+        add_projection=True):
+    """
+    Получает список постов по заданным параметрам.
+    С add_projection загружаются только поля, нужные карточке поста:
+    вместо полного текста — сохранённый анонс.
+    """
     posts = manager.select_related(
         'author',
         'category',
         'location'
     )
-    if add_annotate:
-        posts = posts.annotate(
-            comment_count=Count('comments')
-        ).order_by(
-            '-pub_date'
+    if add_projection:
+        posts = posts.only(*FEED_POST_FIELDS)
+    if add_ordering:
+        posts = posts.order_by(
+            '-pub_date',
+            '-id'
         )
 
     if add_filters:
         posts = posts.filter(
-            is_published=True,
-            pub_date__lte=timezone.now(),
-            category__is_published=True
+            is_visible=True,
+            pub_date__lte=get_feed_visibility().cutoff
         )
 
     return posts
+
+
+def get_visible_posts(user, manager: Manager = Post.objects):
+    """
+    Получает посты, которые пользователь может открыть: опубликованные
+    и уже наступившие, а также все его собственные.
+    """
+    visible = Q(is_visible=True, pub_date__lte=timezone.now())
+    if user.is_authenticated:
+        visible |= Q(author=user)
+    return manager.filter(visible)
+
+
+def get_comments_page(post, cursor=None):
+    """Получает порцию комментариев к посту после переданного курсора."""
+    return CursorPaginator(
+        post.comments.select_related('author'),
+        settings.COMMENT_LIMIT_FOR_PAGINATE,
+        date_field='created_at',
+        descending=False
+    ).page(cursor)
+
+
+def request_cached(method):
+    """
+    Запоминает результат метода представления без аргументов. Экземпляр
+    представления создаётся на каждый запрос, поэтому результат не
+    переходит в другие запросы и потоки.
+    """
+    attr_name = f'_{method.__name__}_result'
+
+    @wraps(method)
+    def wrapper(self):
+        if attr_name not in self.__dict__:
+            self.__dict__[attr_name] = method(self)
+        return self.__dict__[attr_name]
+
+    return wrapper
+
+
+def get_published_category(slug):
+    """Получает опубликованную категорию по slug или вызывает Http404."""
+    category = category_lookup_cache.get(slug)
+    if category is None:
+        category = get_object_or_404(Category, slug=slug, is_published=True)
+        category_lookup_cache.set(slug, category)
+    return category
+
+
+def get_author_by_username(username):
+    """Получает пользователя по имени или вызывает Http404."""
+    author = author_lookup_cache.get(username)
+    if author is None:
+        author = get_object_or_404(get_user_model(), username=username)
+        author_lookup_cache.set(username, author)
+    return author
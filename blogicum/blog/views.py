@@ -2,20 +2,32 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import Http404
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
 from django.views.generic import (
     CreateView, DeleteView, DetailView, ListView, UpdateView)
 
+from .cache import author_scope, category_scope, get_detail_shell_cache_key
 from .forms import CommentCreateForm, PostCreateForm, ProfileEditForm
-from .mixins import CommentMixin, PostAuthorRequiredMixin
-from .models import Category, Comment, Post
-from .utils import get_queryset_posts
-
-
-class PostListView(ListView):
+from .mixins import (
+    AnonymousPageCacheMixin, CachedCountMixin, CommentMixin,
+    CursorPaginationMixin, FeedCardsMixin, FeedConditionalGetMixin,
+    FeedRowsMixin, PostAuthorRequiredMixin, PostConditionalGetMixin,
+    StreamingFeedMixin)
+from .models import Comment, Post
+from .personalization import fill_personal_fragments
+from .utils import (
+    get_author_by_username, get_comments_page, get_published_category,
+    get_queryset_posts, get_visible_posts, request_cached)
+
+
+class PostListView(
+        FeedConditionalGetMixin, AnonymousPageCacheMixin, StreamingFeedMixin,
+        FeedRowsMixin, CursorPaginationMixin, CachedCountMixin, ListView):
     """
     Возвращает страницу с последними опубликованными постами
     в заданном количестве POST_LIMIT.
@@ -28,7 +40,7 @@ class PostListView(ListView):
         return get_queryset_posts()
 
 
-class PostDetailView(DetailView):
+class PostDetailView(PostConditionalGetMixin, DetailView):
     """Возвращает страницу конкретного поста с комментариями."""
 
     template_name = 'blog/detail.html'
@@ -36,39 +48,88 @@ class PostDetailView(DetailView):
     pk_url_kwarg = 'post_id'
 
     def get_object(self):
-        current_post = get_object_or_404(
-            Post,
+        return get_object_or_404(
+            get_visible_posts(
+                self.request.user,
+                Post.objects.select_related(
+                    'author', 'category', 'location'
+                ).defer('text')
+            ),
             pk=self.kwargs[self.pk_url_kwarg]
         )
-        current_time = timezone.now()
 
-        if (self.request.user != current_post.author
-            and (current_post.is_published is False
-                 or current_post.pub_date > current_time
-                 or current_post.category.is_published is False)):
-            raise Http404
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['form'] = CommentCreateForm()
+        context['comments'] = get_comments_page(
+            self.object, self.request.GET.get('comments'))
+        return context
 
-        return current_post
+    def get(self, request, *args, **kwargs):
+        """
+        При включённой настройке POST_DETAIL_SHELL_TIMEOUT страница
+        опубликованного поста рендерится один раз для всех пользователей,
+        а персональные фрагменты подставляются в неё при каждом запросе.
+        """
+        if not settings.POST_DETAIL_SHELL_TIMEOUT:
+            return super().get(request, *args, **kwargs)
+        post_id = self.kwargs[self.pk_url_kwarg]
+        # Версия области есть в кеше только у существующих постов, поэтому
+        # ключ общей копии строится после проверки поста запросом.
+        key = get_detail_shell_cache_key(request, post_id, create=False)
+        shell = None if key is None else cache.get(key)
+        if shell is None:
+            self.object = self.get_object()
+            key = get_detail_shell_cache_key(request, post_id)
+            response = self.render_to_response(self.get_context_data(
+                object=self.object, shared_shell=True))
+            shell = response.render().content.decode()
+            if (self.object.is_visible
+                    and self.object.pub_date <= timezone.now()):
+                cache.set(key, shell, settings.POST_DETAIL_SHELL_TIMEOUT)
+        return HttpResponse(fill_personal_fragments(
+            shell, request, {'form': CommentCreateForm()}))
+
+
+class PostCommentsView(PostConditionalGetMixin, DetailView):
+    """
+    Возвращает HTML-фрагмент со следующей порцией комментариев к посту
+    для их подгрузки на странице поста.
+    """
+
+    template_name = 'includes/comment_list.html'
+    template_engine = settings.FEED_TEMPLATE_ENGINE
+    context_object_name = 'post'
+    pk_url_kwarg = 'post_id'
+
+    def get_object(self):
+        return get_object_or_404(
+            get_visible_posts(self.request.user),
+            pk=self.kwargs[self.pk_url_kwarg]
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['form'] = CommentCreateForm()
-        context['comments'] = self.object.comments.select_related('author')
+        context['comments'] = get_comments_page(
+            self.object, self.request.GET.get('cursor'))
         return context
 
 
-class CategoryPostsListView(ListView):
+class CategoryPostsListView(
+        FeedConditionalGetMixin, AnonymousPageCacheMixin, StreamingFeedMixin,
+        FeedRowsMixin, CursorPaginationMixin, CachedCountMixin, ListView):
     """Возвращает страницу с постами в выбранной категории."""
 
     template_name = 'blog/category.html'
     paginate_by = settings.POST_LIMIT_FOR_PAGINATE
     slug_url_kwarg = 'category_slug'
 
+    def get_page_cache_scopes(self):
+        return (category_scope(self.kwargs[self.slug_url_kwarg]),)
+
+    @request_cached
     def get_category(self):
-        return get_object_or_404(
-            Category,
-            slug=self.kwargs[self.slug_url_kwarg],
-            is_published=True,)
+        return get_published_category(self.kwargs[self.slug_url_kwarg])
 
     def get_queryset(self):
         return get_queryset_posts(self.get_category().posts)
@@ -79,7 +140,9 @@ class CategoryPostsListView(ListView):
         return context
 
 
-class ProfileListView(ListView):
+class ProfileListView(
+        FeedConditionalGetMixin, AnonymousPageCacheMixin, StreamingFeedMixin,
+        FeedRowsMixin, CursorPaginationMixin, CachedCountMixin, ListView):
     """
     Возвращает страницу с профилем пользователя, где указана краткая
     информация о нем и его посты.
@@ -89,10 +152,15 @@ class ProfileListView(ListView):
     paginate_by = settings.POST_LIMIT_FOR_PAGINATE
     slug_url_kwarg = 'username'
 
+    def get_page_cache_scopes(self):
+        return (author_scope(self.kwargs[self.slug_url_kwarg]),)
+
+    def get_count_cache_mode(self):
+        return 'owner' if self.request.user == self.get_author() else ''
+
+    @request_cached
     def get_author(self):
-        return get_object_or_404(
-            get_user_model(),
-            username=self.kwargs[self.slug_url_kwarg])
+        return get_author_by_username(self.kwargs[self.slug_url_kwarg])
 
     def get_queryset(self):
         author = self.get_author()
@@ -108,6 +176,24 @@ class ProfileListView(ListView):
         return context
 
 
+class PostCardsView(FeedCardsMixin, PostListView):
+    """Возвращает HTML-фрагмент со следующей порцией карточек ленты."""
+
+
+class CategoryPostCardsView(FeedCardsMixin, CategoryPostsListView):
+    """
+    Возвращает HTML-фрагмент со следующей порцией карточек постов
+    выбранной категории.
+    """
+
+
+class ProfilePostCardsView(FeedCardsMixin, ProfileListView):
+    """
+    Возвращает HTML-фрагмент со следующей порцией карточек постов
+    пользователя.
+    """
+
+
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     """Возвращяет страницу редактирования профиля пользователя."""
 
@@ -158,7 +244,7 @@ class PostDeleteView(PostAuthorRequiredMixin, DeleteView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['form'] = PostCreateForm(instance=self.get_object())
+        context['form'] = PostCreateForm(instance=self.object)
         return context
 
     def get_success_url(self):
@@ -174,6 +260,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     form_class = CommentCreateForm
     pk_url_kwarg = 'post_id'
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = get_object_or_404(
@@ -199,7 +286,7 @@ class CommentDeleteView(CommentMixin, DeleteView):
     def get_success_url(self):
         return reverse(
             'blog:post_detail',
-            kwargs={'post_id': self.kwargs[self.query_pk_and_slug[0]]}
+            kwargs={'post_id': self.kwargs[self.post_url_kwarg]}
         )
 
 
@@ -0,0 +1,65 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .models import Post
+
+VISIBILITY_CACHE_KEY = 'blog:visibility'
+
+# Граница видимости постов в лентах. cutoff подставляется в фильтр
+# pub_date__lte вместо текущего времени: посты с pub_date <= cutoff — ровно
+# те, что уже должны быть видны. next_pub_date — дата ближайшей отложенной
+# публикации; до её наступления cutoff не меняется, поэтому SQL-запросы
+# лент и ключи кеша страниц одинаковы от запроса к запросу.
+FeedVisibility = namedtuple('FeedVisibility', ('cutoff', 'next_pub_date'))
+
+
+def _floor(moment, bucket):
+    """Округляет момент вниз до начала интервала длиной bucket секунд."""
+    timestamp = moment.timestamp()
+    return datetime.fromtimestamp(
+        timestamp - timestamp % bucket, tz=timezone.utc)
+
+
+def _compute_visibility(now, bucket):
+    published = Post.objects.filter(is_visible=True)
+    last_pub_date = published.filter(
+        pub_date__lte=now).aggregate(value=Max('pub_date'))['value']
+    next_pub_date = published.filter(
+        pub_date__gt=now).aggregate(value=Min('pub_date'))['value']
+    return FeedVisibility(
+        cutoff=last_pub_date or _floor(now, bucket),
+        next_pub_date=next_pub_date)
+
+
+def get_feed_visibility():
+    """
+    Возвращает текущую границу видимости постов.
+    Граница хранится в общем кеше не дольше POST_VISIBILITY_BUCKET секунд и
+    пересчитывается раньше, если наступила дата отложенной публикации
+    или изменился какой-либо пост.
+    """
+    now = timezone.now()
+    shared_cache = caches[settings.SHARED_CACHE_ALIAS]
+    visibility = shared_cache.get(VISIBILITY_CACHE_KEY)
+    if visibility is None or (
+            visibility.next_pub_date is not None
+            and visibility.next_pub_date <= now):
+        bucket = settings.POST_VISIBILITY_BUCKET
+        visibility = _compute_visibility(now, bucket)
+        timeout = bucket
+        if visibility.next_pub_date is not None:
+            timeout = min(
+                timeout,
+                (visibility.next_pub_date - now) / timedelta(seconds=1))
+        shared_cache.set(VISIBILITY_CACHE_KEY, visibility, max(timeout, 1))
+    return visibility
+
+
+def reset_feed_visibility():
+    """Сбрасывает сохранённую границу видимости после изменения постов."""
+    caches[settings.SHARED_CACHE_ALIAS].delete(VISIBILITY_CACHE_KEY)
@@ -79,6 +79,80 @@ TEMPLATES = [
     },
 ]
 
+# Профиль шаблонов для продакшена: скомпилированные шаблоны хранятся
+# в памяти процесса (cached.Loader), контекстный процессор debug не нужен.
+# Процессор messages оставлен для админ-панели.
+PRODUCTION_TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+if not DEBUG:
+    TEMPLATES = PRODUCTION_TEMPLATES
+    # debug_toolbar не находит app_directories.Loader внутри cached.Loader.
+    SILENCED_SYSTEM_CHECKS = ['debug_toolbar.W006']
+
+# Шаблоны лент (карточки постов, пагинатор, комментарии) на Jinja2.
+# Требует установленного пакета Jinja2.
+POST_JINJA2_TEMPLATES = False
+
+JINJA2_TEMPLATES = {
+    'BACKEND': 'django.template.backends.jinja2.Jinja2',
+    'DIRS': [BASE_DIR / 'jinja2_templates'],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        'environment': 'blog.jinja.environment',
+        'context_processors': [
+            'django.contrib.auth.context_processors.auth',
+        ],
+    },
+}
+
+# Каталог для скомпилированных шаблонов Jinja2; None — временный каталог.
+JINJA2_BYTECODE_CACHE_DIR = None
+
+if POST_JINJA2_TEMPLATES:
+    TEMPLATES = [*TEMPLATES, JINJA2_TEMPLATES]
+
+# Движок, которым рендерятся шаблоны лент; None — шаблоны Django.
+FEED_TEMPLATE_ENGINE = 'jinja2' if POST_JINJA2_TEMPLATES else None
+
+# Шаблоны, которые компилируются при запуске процесса вне режима отладки.
+PRECOMPILED_TEMPLATES = [
+    'base.html',
+    'includes/header.html',
+    'includes/footer.html',
+    'includes/paginator.html',
+    'includes/comments.html',
+    'includes/comment_list.html',
+    'includes/comment_form.html',
+    'includes/form_fields.html',
+    'includes/comment_actions.html',
+    'blog/index.html',
+    'blog/category.html',
+    'blog/profile.html',
+    'blog/detail.html',
+    'blog/includes/post_cards.html',
+    'blog/includes/post_card.html',
+    'blog/includes/post_actions.html',
+    'blog/includes/category_link.html',
+]
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
@@ -93,6 +167,33 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+#
+# В кеше SHARED_CACHE_ALIAS хранятся версии областей кеша, граница
+# видимости постов и блокировки сборки страниц, поэтому при нескольких
+# процессах-обработчиках он должен быть общим (Memcached, Redis).
+# LocMemCache подходит только для разработки с одним процессом (см.
+# проверку blog.W001). Пример общего кеша:
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+#         'LOCATION': '127.0.0.1:11211',
+#     }
+# }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Кеш для состояния, общего для всех процессов: версий областей кеша,
+# границы видимости постов и блокировок сборки страниц. Можно указать
+# отдельный общий кеш, оставив страницы и карточки в кеше по умолчанию.
+SHARED_CACHE_ALIAS = 'default'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -159,3 +260,77 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 # Количество постов для выдачи на странице.
 POST_LIMIT_FOR_PAGINATE = 10
+
+# Количество комментариев, выводимых на странице поста за один раз.
+COMMENT_LIMIT_FOR_PAGINATE = 50
+
+# Курсорная пагинация списков постов вместо постраничной с OFFSET.
+POST_CURSOR_PAGINATION = False
+
+# Строки ленты в виде лёгких объектов PostRow вместо экземпляров моделей.
+POST_FEED_ROWS = False
+
+# Потоковая выдача страниц лент: начало страницы отправляется до запросов
+# к постам, карточки — порциями по POST_STREAM_CHUNK_SIZE. Страницы из кеша
+# для анонимных пользователей по-прежнему отдаются целиком.
+POST_STREAMING_FEEDS = False
+POST_STREAM_CHUNK_SIZE = 5
+
+# Время хранения версий областей кеша (в секундах). Истёкшая версия
+# создаётся заново, поэтому значение ограничивает лишь число ключей
+# в кеше, например для запросов к несуществующим постам.
+CACHE_VERSION_TIMEOUT = 60 * 60 * 24
+
+# Время хранения в кеше страниц для анонимных пользователей (в секундах).
+# 0 отключает кеширование страниц.
+PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Сколько хранится последняя собранная версия страницы (в секундах). Пока
+# один запрос собирает страницу после сброса кеша, остальные получают её.
+PAGE_CACHE_STALE_TIMEOUT = 60 * 60
+
+# Время жизни блокировки сборки страницы и время ожидания чужой сборки,
+# если устаревшей версии нет (в секундах).
+PAGE_CACHE_LOCK_TIMEOUT = 30
+PAGE_CACHE_WAIT_TIMEOUT = 2
+
+# Сколько страниц процесс может собирать одновременно после промаха кеша.
+# Сверх лимита отдаётся последняя собранная версия страницы. Если её нет,
+# запрос ждёт свободного места до PAGE_CACHE_WAIT_TIMEOUT, затем ответ 503.
+PAGE_CACHE_MAX_REGENERATIONS = 4
+
+# Сколько номеров страниц выводится в пагинаторе по обе стороны от текущей
+# и у краёв списка; остальные заменяются многоточием.
+POST_PAGE_RANGE_ON_EACH_SIDE = 2
+POST_PAGE_RANGE_ON_ENDS = 1
+
+# Время хранения в кеше общей для всех пользователей копии страницы поста
+# (в секундах); персональные фрагменты подставляются в неё при каждом
+# запросе. 0 отключает общую копию.
+POST_DETAIL_SHELL_TIMEOUT = 0
+
+# Время хранения в кеше количества постов в лентах (в секундах).
+POST_COUNT_CACHE_TIMEOUT = 60 * 60
+
+# Начиная с какого количества постов в ленте вместо точного COUNT
+# используется оценка из плана запроса (только PostgreSQL).
+# None всегда выполняет COUNT.
+POST_COUNT_ESTIMATE_THRESHOLD = None
+
+# Время хранения в кеше отрендеренных карточек постов (в секундах).
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Максимальное время (в секундах), на которое сохраняется граница видимости
+# постов в лентах. Отложенные публикации появляются точно в срок независимо
+# от этого значения.
+POST_VISIBILITY_BUCKET = 60
+
+# Размер и время жизни (в секундах) кеша категорий и пользователей
+# в памяти процесса.
+LOOKUP_CACHE_SIZE = 256
+LOOKUP_CACHE_TIMEOUT = 60
+
+# Размер и время жизни (в секундах) кеша разметки пустых форм
+# в памяти процесса.
+FORM_HTML_CACHE_SIZE = 32
+FORM_HTML_CACHE_TIMEOUT = 60 * 60
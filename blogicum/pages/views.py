@@ -1,14 +1,16 @@
 from django.shortcuts import render
 from django.views.generic import TemplateView
 
+from blog.mixins import ConditionalGetMixin
 
-class AboutPage(TemplateView):
+
+class AboutPage(ConditionalGetMixin, TemplateView):
     """Возвращает страницу с информацией о блоге."""
 
     template_name = 'pages/about.html'
 
 
-class RulesPage(TemplateView):
+class RulesPage(ConditionalGetMixin, TemplateView):
     """Возвращает страницу с правилами блога."""
 
     template_name = 'pages/rules.html'
@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,18 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from blog.cache import (
+        author_lookup_cache, category_lookup_cache, form_html_cache)
+
+    cache.clear()
+    author_lookup_cache.clear()
+    category_lookup_cache.clear()
+    form_html_cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
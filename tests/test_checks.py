@@ -0,0 +1,28 @@
+from blog.checks import check_shared_cache
+
+
+def test_process_local_cache_warning(settings):
+    settings.DEBUG = False
+    assert [message.id for message in check_shared_cache(None)] == [
+        "blog.W001"], (
+        "Убедитесь, что без общего кеша выводится предупреждение blog.W001."
+    )
+    settings.CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+        "LOCATION": "127.0.0.1:11211",
+    }}
+    assert check_shared_cache(None) == []
+    settings.CACHES = {
+        **settings.CACHES,
+        "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+    settings.SHARED_CACHE_ALIAS = "shared"
+    assert [message.id for message in check_shared_cache(None)] == [
+        "blog.W001"], (
+        "Убедитесь, что проверяется кеш из SHARED_CACHE_ALIAS."
+    )
+
+
+def test_no_warning_in_debug(settings):
+    settings.DEBUG = True
+    assert check_shared_cache(None) == []
@@ -0,0 +1,119 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(Comment, post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что счётчик комментариев увеличивается при добавлении"
+        " комментария."
+    )
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что счётчик комментариев уменьшается при удалении"
+        " комментария."
+    )
+
+    Comment.objects.filter(post=post).delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что счётчик комментариев уменьшается при массовом"
+        " удалении комментариев."
+    )
+
+
+def test_comment_count_on_cascade_delete(
+        mixer, post_with_published_location, another_user):
+    post = post_with_published_location
+    mixer.blend(Comment, post=post, author=another_user)
+    mixer.blend(Comment, post=post)
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что счётчик комментариев уменьшается при каскадном"
+        " удалении комментариев."
+    )
+
+
+def test_comment_count_view(user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    post.refresh_from_db()
+    assert post.comment_count == 1
+    comment = post.comments.get()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+
+def test_repair_comment_counts(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend(Comment, post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=7)
+    call_command("repair_comment_counts", "--dry-run", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 7
+    call_command("repair_comment_counts", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что команда repair_comment_counts исправляет"
+        " расхождения в счётчике комментариев."
+    )
+
+
+@pytest.mark.parametrize("comments", [1, 50])
+def test_post_delete_queries_do_not_grow_with_comments(
+        mixer, django_assert_max_num_queries, post_with_published_location,
+        comments):
+    post = post_with_published_location
+    mixer.cycle(comments).blend(Comment, post=post)
+    with django_assert_max_num_queries(12):
+        post.delete()
+    assert not Comment.objects.exists()
+
+
+def test_bulk_delete_groups_counts_by_post(
+        mixer, django_assert_max_num_queries, post_with_published_location,
+        another_user, published_category):
+    posts = [
+        post_with_published_location,
+        mixer.blend(Post, author=another_user, category=published_category),
+    ]
+    for post in posts:
+        mixer.cycle(30).blend(Comment, post=post)
+    mixer.blend(Comment, post=posts[0])
+    with django_assert_max_num_queries(10):
+        Comment.objects.filter(post__in=posts).exclude(
+            pk=Comment.objects.filter(post=posts[0]).latest("pk").pk
+        ).delete()
+    assert [
+        Post.objects.get(pk=post.pk).comment_count for post in posts
+    ] == [1, 0], (
+        "Убедитесь, что при массовом удалении комментариев счётчик"
+        " уменьшается на число удалённых комментариев каждого поста."
+    )
+
+
+def test_author_delete_decreases_counts_of_other_posts(
+        mixer, django_assert_max_num_queries, post_with_published_location,
+        another_user):
+    post = post_with_published_location
+    mixer.cycle(20).blend(Comment, post=post, author=another_user)
+    mixer.blend(Comment, post=post)
+    own_post = mixer.blend(Post, author=another_user)
+    mixer.cycle(20).blend(Comment, post=own_post)
+    with django_assert_max_num_queries(25):
+        another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1
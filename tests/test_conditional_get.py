@@ -0,0 +1,124 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _revalidate(client, url, response):
+    with CaptureQueriesContext(connection) as ctx:
+        repeated = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    post_queries = [
+        q["sql"] for q in ctx.captured_queries
+        if '"blog_post"' in q["sql"] or '"blog_comment"' in q["sql"]
+    ]
+    return repeated, post_queries
+
+
+@pytest.mark.parametrize("logged_in", [False, True])
+def test_feed_not_modified(
+        logged_in, client, user_client, many_posts_with_published_locations):
+    client = user_client if logged_in else client
+    response = client.get("/")
+    assert response.has_header("ETag") and response.has_header(
+        "Last-Modified")
+    repeated, post_queries = _revalidate(client, "/", response)
+    assert repeated.status_code == 304, (
+        "Убедитесь, что при совпадении ETag лента возвращает 304."
+    )
+    assert not post_queries, (
+        "Убедитесь, что ответ 304 не выполняет запросов к постам."
+    )
+
+
+def test_feed_modified_after_new_post(
+        client, mixer, user, published_category,
+        many_posts_with_published_locations):
+    response = client.get("/")
+    mixer.blend("blog.Post", author=user, category=published_category)
+    repeated, _ = _revalidate(client, "/", response)
+    assert repeated.status_code == 200
+
+
+def test_feed_etag_depends_on_user(
+        client, user_client, many_posts_with_published_locations):
+    assert client.get("/")["ETag"] != user_client.get("/")["ETag"]
+
+
+def test_detail_not_modified_until_comment(
+        user_client, mixer, user, post_with_published_location):
+    comment = mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user)
+    url = f"/posts/{post_with_published_location.id}/"
+    response = user_client.get(url)
+    repeated, post_queries = _revalidate(user_client, url, response)
+    assert repeated.status_code == 304
+    assert len(post_queries) == 1 and post_queries[0].startswith(
+        'SELECT "blog_post"."updated_at" FROM'), (
+        "Убедитесь, что ответ 304 на странице поста читает только момент"
+        " изменения поста."
+    )
+    comment.text = "Изменённый комментарий"
+    comment.save()
+    repeated, _ = _revalidate(user_client, url, response)
+    assert repeated.status_code == 200, (
+        "Убедитесь, что изменение комментария меняет ETag страницы поста."
+    )
+
+
+@pytest.mark.parametrize("change", ["delete", "other_worker"])
+def test_detail_modified_after_comment_change(
+        change, client, mixer, post_with_published_location):
+    comment = mixer.blend("blog.Comment", post=post_with_published_location)
+    url = f"/posts/{post_with_published_location.id}/"
+    response = client.get(url)
+    if change == "delete":
+        comment.delete()
+    else:
+        # Изменение в другом процессе: версии в кеше этого процесса
+        # остаются прежними.
+        with mock.patch("blog.signals.bump_scopes"):
+            mixer.blend("blog.Comment", post=post_with_published_location)
+    repeated, _ = _revalidate(client, url, response)
+    assert repeated.status_code == 200, (
+        "Убедитесь, что ETag страницы поста строится по данным из базы."
+    )
+
+
+def test_detail_etag_follows_visibility_cutoff(
+        client, mixer, user, published_category, post_with_published_location):
+    pub_date = timezone.now() + timedelta(hours=1)
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=pub_date)
+    url = f"/posts/{post_with_published_location.id}/"
+    response = client.get(url)
+    later = pub_date + timedelta(minutes=1)
+    with mock.patch("django.utils.timezone.now", return_value=later):
+        repeated, _ = _revalidate(client, url, response)
+    assert repeated.status_code == 200, (
+        "Убедитесь, что ETag страницы поста меняется, когда отложенный"
+        " пост становится виден."
+    )
+
+
+@pytest.mark.parametrize("shell_timeout", [0, 60])
+def test_missing_post_leaves_no_version_keys(settings, client, shell_timeout):
+    settings.POST_DETAIL_SHELL_TIMEOUT = shell_timeout
+    assert client.get("/posts/987654/").status_code == 404
+    assert cache.get("blog:version:post:987654") is None, (
+        "Убедитесь, что запросы к несуществующим постам не создают"
+        " версий в кеше."
+    )
+
+
+def test_static_page_not_modified(client):
+    response = client.get("/pages/about/")
+    repeated = client.get(
+        "/pages/about/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+    assert repeated.status_code == 304
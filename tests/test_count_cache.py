@@ -0,0 +1,68 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import pagination
+from blog.visibility import get_feed_visibility
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_queries(client, url):
+    get_feed_visibility()
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [q["sql"] for q in ctx.captured_queries if "COUNT(" in q["sql"]]
+
+
+@pytest.mark.parametrize("url_name", ["index", "category", "profile"])
+def test_count_is_cached(
+        url_name, user_client, many_posts_with_published_locations,
+        published_category, user):
+    url = {
+        "index": "/",
+        "category": f"/category/{published_category.slug}/",
+        "profile": f"/profile/{user.username}/",
+    }[url_name]
+    assert _count_queries(user_client, url)
+    assert not _count_queries(user_client, url), (
+        "Убедитесь, что количество постов для пагинации берётся из кеша."
+    )
+
+
+def test_count_cache_invalidated_by_new_post(
+        user_client, mixer, user, many_posts_with_published_locations,
+        published_category):
+    count = user_client.get("/").context["paginator"].count
+    mixer.blend("blog.Post", author=user, category=published_category)
+    assert user_client.get("/").context["paginator"].count == count + 1, (
+        "Убедитесь, что кеш количества постов сбрасывается при"
+        " публикации нового поста."
+    )
+
+
+def test_owner_and_reader_counts_are_separate(
+        user_client, another_user_client, mixer, user, published_category,
+        many_posts_with_published_locations):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False,
+    )
+    url = f"/profile/{user.username}/"
+    reader_count = another_user_client.get(url).context["paginator"].count
+    owner_count = user_client.get(url).context["paginator"].count
+    assert owner_count == reader_count + 1
+
+
+def test_estimated_count_for_large_scopes(
+        settings, monkeypatch, user_client,
+        many_posts_with_published_locations):
+    settings.POST_COUNT_ESTIMATE_THRESHOLD = 1000
+    monkeypatch.setattr(pagination, "estimate_count", lambda qs: 5000)
+    paginator = user_client.get("/").context["paginator"]
+    assert paginator.count == 5000
+    monkeypatch.setattr(pagination, "estimate_count", lambda qs: None)
+    assert pagination.CachedCountPaginator(
+        paginator.object_list, 10, estimate_threshold=1000
+    ).count == paginator.object_list.count()
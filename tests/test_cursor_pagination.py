@@ -0,0 +1,85 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.views import CategoryPostsListView, PostListView, ProfileListView
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def cursor_pagination(monkeypatch):
+    for view in (PostListView, CategoryPostsListView, ProfileListView):
+        monkeypatch.setattr(view, "cursor_pagination", True)
+
+
+@pytest.fixture
+def posts_with_equal_dates(mixer, user, published_category):
+    pub_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=pub_date,
+    )
+
+
+def _walk(client, url, direction):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        page = response.context["page_obj"]
+        pages.append([post.id for post in page])
+        cursor = (
+            page.next_cursor if direction == "next" else page.previous_cursor
+        )
+        url = f"{url.split('?')[0]}?cursor={cursor}" if cursor else None
+        if cursor:
+            assert f"?cursor={cursor}" in response.content.decode()
+    return pages
+
+
+@pytest.mark.usefixtures("cursor_pagination")
+def test_cursor_pagination_walks_all_posts(
+        user_client, user, published_category, posts_with_equal_dates):
+    expected = sorted(
+        posts_with_equal_dates, key=lambda p: (p.pub_date, p.id),
+        reverse=True)
+    for url in ("/", f"/category/{published_category.slug}/",
+                f"/profile/{user.username}/"):
+        pages = _walk(user_client, url, "next")
+        assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE, 3]
+        assert sum(pages, []) == [post.id for post in expected], (
+            "Убедитесь, что курсорная пагинация выдаёт все посты по одному"
+            " разу в порядке «от новых к старым»."
+        )
+
+
+@pytest.mark.usefixtures("cursor_pagination")
+def test_cursor_pagination_goes_back(user_client, posts_with_equal_dates):
+    forward = _walk(user_client, "/", "next")
+    last_page = user_client.get("/").context["page_obj"]
+    url = f"/?cursor={last_page.next_cursor}"
+    second = user_client.get(url).context["page_obj"]
+    back = user_client.get(f"/?cursor={second.previous_cursor}")
+    assert [post.id for post in back.context["page_obj"]] == forward[0]
+    assert not back.context["page_obj"].has_previous()
+
+
+@pytest.mark.usefixtures("cursor_pagination")
+def test_cursor_pagination_invalid_cursor(user_client):
+    assert user_client.get("/?cursor=not-a-cursor").status_code == 404
+
+
+@pytest.mark.usefixtures("cursor_pagination")
+def test_cursor_pagination_has_no_count(user_client, posts_with_equal_dates):
+    first = user_client.get("/").context["page_obj"]
+    with CaptureQueriesContext(connection) as queries:
+        user_client.get(f"/?cursor={first.next_cursor}")
+    assert not any(
+        re.search(r"COUNT\(", query["sql"]) for query in queries
+    ), "Убедитесь, что курсорная пагинация не выполняет COUNT."
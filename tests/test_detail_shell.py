@@ -0,0 +1,81 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="\w+"')
+
+
+@pytest.fixture
+def shared_shell(settings):
+    settings.POST_DETAIL_SHELL_TIMEOUT = 60
+
+
+@pytest.fixture
+def commented_post(mixer, user, another_user, post_with_published_location):
+    mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user)
+    mixer.blend(
+        "blog.Comment", post=post_with_published_location,
+        author=another_user)
+    return post_with_published_location
+
+
+def _content(response):
+    assert response.status_code == 200
+    return CSRF_RE.sub("", response.content.decode())
+
+
+@pytest.mark.parametrize("client_name", [
+    "client", "user_client", "another_user_client"])
+def test_shell_matches_regular_page(
+        request, settings, client_name, commented_post):
+    client = request.getfixturevalue(client_name)
+    url = f"/posts/{commented_post.id}/"
+    regular = _content(client.get(url))
+    settings.POST_DETAIL_SHELL_TIMEOUT = 60
+    client.get(url)
+    assert _content(client.get(url)) == regular, (
+        "Убедитесь, что страница поста, собранная из общей копии и"
+        " персональных фрагментов, совпадает с обычной."
+    )
+
+
+def test_shell_shared_between_users(
+        shared_shell, client, user_client, commented_post):
+    url = f"/posts/{commented_post.id}/"
+    client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        content = user_client.get(url).content.decode()
+    assert not [
+        q for q in ctx.captured_queries
+        if ('"blog_post"' in q["sql"] or '"blog_comment"' in q["sql"])
+        and not q["sql"].startswith('SELECT "blog_post"."updated_at" FROM')
+    ], "Убедитесь, что общая копия страницы поста берётся из кеша."
+    assert "Отредактировать публикацию" in content
+    assert "Оставить комментарий" in content
+    assert "<!--esi:" not in content
+
+
+def test_shell_refreshed_after_comment(
+        shared_shell, client, mixer, commented_post):
+    url = f"/posts/{commented_post.id}/"
+    client.get(url)
+    comment = mixer.blend("blog.Comment", post=commented_post)
+    content = client.get(url).content.decode()
+    assert f'name="comment_{comment.id}"' in content
+
+
+def test_hidden_post_shell_not_shared(
+        shared_shell, client, user_client, commented_post):
+    commented_post.is_published = False
+    commented_post.save()
+    url = f"/posts/{commented_post.id}/"
+    assert user_client.get(url).status_code == 200
+    assert client.get(url).status_code == 404, (
+        "Убедитесь, что общая копия страницы снятого с публикации поста"
+        " не выдаётся другим пользователям."
+    )
@@ -0,0 +1,64 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.urls import NoReverseMatch, reverse, set_script_prefix
+from django.urls.resolvers import URLResolver
+
+from blog.routing import fast_reverse
+
+ARGS = {
+    "blog:index": (),
+    "blog:create_post": (),
+    "blog:post_detail": (7,),
+    "blog:edit_post": ("7",),
+    "blog:post_comments": (7,),
+    "blog:edit_comment": (7, 12),
+    "blog:category_posts": ("my-category_1",),
+    "blog:profile": ("user.name+@-",),
+    "blog:profile_cards": ("имя",),
+    "pages:about": (),
+    "login": (),
+}
+
+
+@pytest.mark.parametrize("prefix", ["/", "/blog%20app/"])
+def test_fast_reverse_matches_reverse(prefix):
+    set_script_prefix(prefix)
+    try:
+        for viewname, args in ARGS.items():
+            assert fast_reverse(viewname, *args) == reverse(
+                viewname, args=args), (
+                f"Убедитесь, что адрес `{viewname}` совпадает с reverse()."
+            )
+    finally:
+        set_script_prefix("/")
+
+
+@pytest.mark.parametrize("viewname, args", [
+    ("blog:post_detail", ("abc",)),
+    ("blog:post_detail", (1, 2)),
+    ("blog:category_posts", ("с пробелом",)),
+    ("blog:profile", ("a/b",)),
+    ("blog:missing", (1,)),
+])
+def test_fast_reverse_rejects_bad_args(viewname, args):
+    with pytest.raises(NoReverseMatch):
+        fast_reverse(viewname, *args)
+
+
+@pytest.mark.django_db
+def test_feed_does_not_walk_resolver(
+        client, many_posts_with_published_locations):
+    client.get("/")
+    cache.clear()
+    with mock.patch.object(
+            URLResolver, "_reverse_with_prefix",
+            autospec=True, side_effect=URLResolver._reverse_with_prefix,
+    ) as reverse_with_prefix:
+        response = client.get("/")
+    assert response.status_code == 200
+    assert not reverse_with_prefix.called, (
+        "Убедитесь, что адреса на странице ленты строятся без обхода"
+        " резолвера."
+    )
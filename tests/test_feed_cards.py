@@ -0,0 +1,63 @@
+import pytest
+
+from blog.utils import get_queryset_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _walk_cards(client, url):
+    ids, cursor = [], None
+    while True:
+        response = client.get(url, {"cursor": cursor} if cursor else {})
+        assert response.status_code == 200
+        ids.extend(post.id for post in response.context["page_obj"])
+        cursor = response.get("X-Next-Cursor")
+        if not cursor:
+            return ids, response
+
+
+def test_index_cards_return_fragment(
+        client, many_posts_with_published_locations):
+    response = client.get("/cards/")
+    content = response.content.decode()
+    assert response.status_code == 200
+    assert "<html" not in content and "<nav" not in content, (
+        "Убедитесь, что фрагмент ленты не содержит разметки base.html"
+        " и пагинатора."
+    )
+    assert content.count('<article class="mb-5">') == 10
+    assert response["X-Next-Cursor"]
+
+
+def test_index_cards_walk_whole_feed(
+        client, many_posts_with_published_locations):
+    ids, _ = _walk_cards(client, "/cards/")
+    assert ids == list(get_queryset_posts().values_list("id", flat=True)), (
+        "Убедитесь, что порции фрагментов ленты проходят всю ленту"
+        " без пропусков и повторов."
+    )
+
+
+def test_category_and_profile_cards(
+        user_client, user, published_category,
+        many_posts_with_published_locations, mixer):
+    hidden = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False,
+    )
+    category_ids, _ = _walk_cards(
+        user_client, f"/category/{published_category.slug}/cards/")
+    assert hidden.id not in category_ids
+    assert category_ids == list(
+        get_queryset_posts(published_category.posts).values_list(
+            "id", flat=True))
+    profile_ids, _ = _walk_cards(
+        user_client, f"/profile/{user.username}/cards/")
+    assert hidden.id in profile_ids, (
+        "Убедитесь, что автор видит во фрагментах своей страницы"
+        " снятые с публикации посты."
+    )
+
+
+def test_unknown_category_cards_not_found(client):
+    assert client.get("/category/unknown/cards/").status_code == 404
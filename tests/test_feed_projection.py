@@ -0,0 +1,126 @@
+import json
+from importlib import import_module
+from io import StringIO
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+
+from blog.models import Post
+from blog.utils import get_queryset_posts
+from blog.visibility import get_feed_visibility
+
+pytestmark = [pytest.mark.django_db]
+
+SENSITIVE_USER_COLUMNS = (
+    "password", "email", "is_superuser", "is_staff", "last_login",
+    "first_name", "last_name",
+)
+
+
+def test_feed_query_skips_full_text_and_user_columns():
+    sql = str(get_queryset_posts().query)
+    select_clause = sql.split(" FROM ")[0]
+    assert '"blog_post"."text"' not in select_clause, (
+        "Убедитесь, что запрос ленты не загружает полный текст постов."
+    )
+    for column in SENSITIVE_USER_COLUMNS:
+        assert f'"auth_user"."{column}"' not in select_clause, (
+            "Убедитесь, что запрос ленты не загружает лишние поля"
+            f" пользователя, в том числе `{column}`."
+        )
+    assert '"blog_category"."description"' not in select_clause
+
+
+def test_feed_renders_without_extra_queries(
+        user_client, many_posts_with_published_locations,
+        django_assert_num_queries):
+    get_feed_visibility()
+    # Сессия, пользователь, количество постов и сама страница.
+    with django_assert_num_queries(4):
+        response = user_client.get("/")
+    assert len(response.context["page_obj"]) == 10
+
+
+def test_feed_card_shows_excerpt(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    post.text = " ".join(f"слово{i}" for i in range(20))
+    post.save()
+    content = user_client.get("/").content.decode()
+    assert "слово9 …" in content
+    assert "слово10" not in content
+
+
+def test_excerpt_and_body_html_are_stored(post_with_published_location):
+    post = post_with_published_location
+    post.text = "<b>жирный</b>\n" + " ".join("слово" for _ in range(20))
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt.endswith("…")
+    assert len(post.excerpt.split()) == 11
+    assert post.body_html.startswith("&lt;b&gt;жирный&lt;/b&gt;<br>"), (
+        "Убедитесь, что HTML текста поста экранируется и сохраняется при"
+        " сохранении поста."
+    )
+
+
+def test_backfill_post_html(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(excerpt="", body_html="")
+    call_command("backfill_post_html", "--batch-size", "1", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.excerpt and post.body_html, (
+        "Убедитесь, что команда backfill_post_html заполняет анонс и HTML"
+        " текста постов."
+    )
+
+
+def test_backfill_refreshes_cached_cards(client, post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(excerpt="", body_html="")
+    client.get("/")
+    call_command("backfill_post_html", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.excerpt in client.get("/").content.decode(), (
+        "Убедитесь, что после backfill_post_html лента выводит новые анонсы,"
+        " а не карточки и страницы из кеша."
+    )
+
+
+def test_migration_fills_excerpt_and_body_html(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(excerpt="", body_html="")
+    migration = import_module(
+        "blog.migrations.0012_backfill_post_excerpt_body_html")
+    migration.backfill_excerpt_body_html(apps, None)
+    excerpt, body_html = post.excerpt, post.body_html
+    post.refresh_from_db()
+    assert (post.excerpt, post.body_html) == (excerpt, body_html), (
+        "Убедитесь, что миграция заполняет анонс и HTML текста так же,"
+        " как Post.render_text."
+    )
+
+
+def test_loaddata_fills_excerpt_and_body_html(
+        tmp_path, user, published_category):
+    fixture = tmp_path / "posts.json"
+    fixture.write_text(json.dumps([{
+        "model": "blog.post",
+        "pk": 1000,
+        "fields": {
+            "title": "Пост из фикстуры",
+            "text": "Первая строка\nвторая строка",
+            "pub_date": "2022-12-18T23:03:52Z",
+            "author": user.pk,
+            "category": published_category.pk,
+            "is_published": True,
+            "created_at": "2022-12-18T23:03:52Z",
+        },
+    }]))
+    call_command("loaddata", str(fixture), stdout=StringIO())
+    post = Post.objects.get(pk=1000)
+    assert post.excerpt and post.body_html == "Первая строка<br>вторая строка", (
+        "Убедитесь, что анонс и HTML текста заполняются при загрузке"
+        " фикстур."
+    )
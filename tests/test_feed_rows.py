@@ -0,0 +1,67 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.template.loader import render_to_string
+
+from blog.mixins import FeedRowsMixin
+from blog.rows import PostRow, as_feed_rows
+from blog.utils import get_queryset_posts
+from blog.views import PostListView
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_rows(monkeypatch):
+    monkeypatch.setattr(FeedRowsMixin, "feed_rows", True)
+
+
+def test_rows_render_same_card_as_models(
+        post_with_published_location, post_of_another_author):
+    posts = list(get_queryset_posts())
+    rows = list(as_feed_rows(get_queryset_posts()))
+    assert [row.pk for row in rows] == [post.pk for post in posts]
+    for post, row in zip(posts, rows):
+        assert isinstance(row, PostRow)
+        assert not hasattr(row, "__dict__")
+        assert render_to_string(
+            "blog/includes/post_card.html", {"post": row}
+        ) == render_to_string(
+            "blog/includes/post_card.html", {"post": post}
+        ), (
+            "Убедитесь, что карточка из строки ленты совпадает с карточкой"
+            " из экземпляра модели."
+        )
+
+
+def test_row_without_location_and_image(mixer, user, published_category):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=None, image="",
+    )
+    row = as_feed_rows(get_queryset_posts()).get()
+    assert row.location is None
+    assert not row.image
+
+
+@pytest.mark.parametrize("cursor", [False, True])
+def test_feed_pages_use_rows(
+        feed_rows, monkeypatch, cursor, client,
+        many_posts_with_published_locations):
+    monkeypatch.setattr(PostListView, "cursor_pagination", cursor)
+    response = client.get("/")
+    page = response.context["page_obj"]
+    assert len(page) == 10
+    assert all(isinstance(row, PostRow) for row in page), (
+        "Убедитесь, что при включённой настройке POST_FEED_ROWS страница"
+        " ленты состоит из строк PostRow."
+    )
+    assert page[0].title in response.content.decode()
+
+
+def test_benchmark_command(post_with_published_location):
+    out = StringIO()
+    call_command("benchmark_feed_rows", pages=1, repeat=1, stdout=out)
+    output = out.getvalue()
+    assert "ORM" in output and "PostRow" in output
@@ -0,0 +1,54 @@
+import re
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="(\w+)"')
+
+
+def _templates(response):
+    return [template.name for template in response.templates]
+
+
+def test_comment_form_rendered_once(
+        user_client, another_user_client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/"
+    first = user_client.get(url)
+    assert "includes/form_fields.html" in _templates(first)
+    second = another_user_client.get(url)
+    assert "includes/form_fields.html" not in _templates(second), (
+        "Убедитесь, что разметка пустой формы комментария рендерится"
+        " один раз на процесс."
+    )
+    first_html, second_html = first.content.decode(), second.content.decode()
+    assert 'name="text"' in second_html
+    assert CSRF_RE.search(first_html)[1] != CSRF_RE.search(second_html)[1], (
+        "Убедитесь, что токен CSRF выводится для каждого запроса отдельно."
+    )
+
+
+def test_create_form_follows_categories(user_client, mixer):
+    user_client.get("/posts/create/")
+    category = mixer.blend("blog.Category", title="Новая категория")
+    response = user_client.get("/posts/create/")
+    assert category.title in response.content.decode(), (
+        "Убедитесь, что разметка формы создания поста обновляется"
+        " при изменении категорий."
+    )
+    category.delete()
+    response = user_client.get("/posts/create/")
+    assert category.title not in response.content.decode()
+
+
+def test_filled_forms_not_cached(
+        user_client, post_with_published_location):
+    user_client.get("/posts/create/")
+    url = f"/posts/{post_with_published_location.id}/edit/"
+    content = user_client.get(url).content.decode()
+    assert post_with_published_location.title in content, (
+        "Убедитесь, что форма редактирования поста выводит его данные."
+    )
+    response = user_client.post("/posts/create/", {"title": ""})
+    assert "includes/form_fields.html" in _templates(response)
+    assert "is-invalid" in response.content.decode()
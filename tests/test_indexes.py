@@ -0,0 +1,85 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+
+from blog.models import Comment
+from blog.views import CategoryPostsListView, PostListView, ProfileListView
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite",
+        reason="Планы запросов проверяются на SQLite."),
+]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category, published_location):
+    return mixer.cycle(30).blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location,
+    )
+
+
+def get_view_queryset(view_class, user, **kwargs):
+    request = RequestFactory().get("/")
+    request.user = user
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view.get_queryset()
+
+
+def assert_uses_index(queryset, index_names, page_name):
+    plan = queryset.explain()
+    assert any(name in plan for name in index_names), (
+        f"Убедитесь, что запрос {page_name} использует индекс"
+        f" {' или '.join(index_names)}. План запроса:\n{plan}"
+    )
+    assert "SCAN blog_post" not in plan, (
+        f"Убедитесь, что запрос {page_name} не читает таблицу постов"
+        f" целиком. План запроса:\n{plan}"
+    )
+
+
+@pytest.mark.usefixtures("feed_posts")
+def test_index_page_uses_index(another_user):
+    assert_uses_index(
+        get_view_queryset(PostListView, another_user),
+        ("post_feed_pub_date_idx", "post_visible_pub_date_idx"),
+        "главной страницы",
+    )
+
+
+@pytest.mark.usefixtures("feed_posts")
+def test_category_page_uses_index(another_user, published_category):
+    assert_uses_index(
+        get_view_queryset(
+            CategoryPostsListView, another_user,
+            category_slug=published_category.slug),
+        ("post_feed_category_idx", "post_category_pub_date_idx"),
+        "страницы категории",
+    )
+
+
+@pytest.mark.usefixtures("feed_posts")
+@pytest.mark.parametrize("owner", (True, False))
+def test_profile_page_uses_index(owner, user, another_user):
+    assert_uses_index(
+        get_view_queryset(
+            ProfileListView, user if owner else another_user,
+            username=user.username),
+        ("post_author_pub_date_idx",),
+        "страницы пользователя",
+    )
+
+
+def test_comments_use_index(mixer, feed_posts):
+    mixer.cycle(5).blend(Comment, post=feed_posts[0])
+    plan = feed_posts[0].comments.select_related("author").explain()
+    assert "comment_post_created_at_idx" in plan, (
+        "Убедитесь, что комментарии к посту выбираются по индексу"
+        f" comment_post_created_at_idx. План запроса:\n{plan}"
+    )
+    assert "TEMP B-TREE" not in plan, (
+        "Убедитесь, что сортировка комментариев берётся из индекса."
+    )
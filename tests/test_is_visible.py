@@ -0,0 +1,110 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+from blog.utils import get_queryset_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def category_posts(mixer, user, published_category):
+    published = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category)
+    hidden = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False)
+    return published, hidden
+
+
+def visible_ids():
+    return set(
+        Post.objects.filter(is_visible=True).values_list("id", flat=True))
+
+
+def test_is_visible_on_save(post_with_published_location):
+    post = post_with_published_location
+    assert post.is_visible
+    post.is_published = False
+    post.save()
+    post.refresh_from_db()
+    assert not post.is_visible, (
+        "Убедитесь, что флаг is_visible пересчитывается при сохранении"
+        " поста."
+    )
+
+
+def test_category_publication_updates_posts(
+        category_posts, published_category):
+    published, hidden = category_posts
+    assert visible_ids() == {post.id for post in published}
+
+    published_category.is_published = False
+    published_category.save()
+    assert visible_ids() == set(), (
+        "Убедитесь, что при снятии категории с публикации её посты"
+        " скрываются."
+    )
+
+    published_category.is_published = True
+    published_category.save()
+    assert visible_ids() == {post.id for post in published}, (
+        "Убедитесь, что при повторной публикации категории снова видны"
+        " только опубликованные посты."
+    )
+
+
+def test_category_delete_hides_posts(category_posts, published_category):
+    published_category.delete()
+    assert visible_ids() == set()
+
+
+def test_feed_filter_has_no_category_join():
+    where = str(get_queryset_posts().query).split("WHERE")[1]
+    assert "blog_category" not in where, (
+        "Убедитесь, что лента фильтруется по флагу is_visible без условий"
+        " по таблице категорий."
+    )
+
+
+def test_loaddata_sets_is_visible(tmp_path, user, published_category):
+    fields = {
+        "text": "Текст",
+        "pub_date": "2022-12-18T23:03:52Z",
+        "author": user.pk,
+        "category": published_category.pk,
+        "created_at": "2022-12-18T23:03:52Z",
+    }
+    fixture = tmp_path / "posts.json"
+    fixture.write_text(json.dumps([
+        {"model": "blog.post", "pk": 1000,
+         "fields": {**fields, "title": "Виден", "is_published": True}},
+        {"model": "blog.post", "pk": 1001,
+         "fields": {**fields, "title": "Скрыт", "is_published": False}},
+    ]))
+    call_command("loaddata", str(fixture), stdout=StringIO())
+    assert visible_ids() == {1000}, (
+        "Убедитесь, что флаг is_visible вычисляется при загрузке фикстур."
+    )
+
+
+def test_recompute_post_visibility(
+        client, category_posts, published_category):
+    published, hidden = category_posts
+    Post.objects.update(is_visible=False)
+    assert published[0].title not in client.get("/").content.decode()
+    Post.objects.bulk_create([Post(
+        title="Без save", text="Текст", author=published[0].author,
+        category=published_category, pub_date=published[0].pub_date,
+        is_visible=True, is_published=False)])
+    call_command("recompute_post_visibility", stdout=StringIO())
+    assert visible_ids() == {post.id for post in published}, (
+        "Убедитесь, что команда recompute_post_visibility пересчитывает"
+        " флаг is_visible."
+    )
+    assert published[0].title in client.get("/").content.decode(), (
+        "Убедитесь, что после пересчёта видимости сбрасывается кеш лент."
+    )
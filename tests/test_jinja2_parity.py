@@ -0,0 +1,89 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.template import engines
+
+from blog.pagination import CachedCountPaginator, CursorPaginator
+from blog.rows import as_feed_rows
+from blog.utils import get_comments_page, get_queryset_posts
+
+jinja2 = pytest.importorskip("jinja2")
+
+from blog.jinja import get_engine  # noqa: E402
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _assert_same_html(name, context):
+    django_html = engines["django"].get_template(name).render(context)
+    jinja2_html = get_engine().get_template(name).render(context)
+    assert jinja2_html == django_html, (
+        f"Убедитесь, что шаблон `{name}` на Jinja2 выводит тот же HTML,"
+        " что и шаблон Django."
+    )
+
+
+@pytest.fixture
+def tricky_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="«Кавычки» \"двойные\" и 'одинарные' <b>теги</b> & амперсанд",
+        text="Первая строка\nвторая <i>строка</i>", location=None,
+    )
+
+
+def test_post_card_parity(
+        tricky_post, post_with_published_location, post_of_another_author):
+    for post in get_queryset_posts():
+        _assert_same_html("blog/includes/post_card.html", {"post": post})
+    for row in as_feed_rows(get_queryset_posts()):
+        _assert_same_html("blog/includes/post_card.html", {"post": row})
+
+
+@pytest.mark.parametrize("number", [1, 2, 3])
+def test_paginator_parity(number, many_posts_with_published_locations):
+    paginator = CachedCountPaginator(get_queryset_posts(), 1)
+    _assert_same_html(
+        "includes/paginator.html", {"page_obj": paginator.page(number)})
+    _assert_same_html(
+        "includes/paginator.html",
+        {"page_obj": Paginator(get_queryset_posts(), 100).page(1)})
+
+
+def test_cursor_paginator_parity(many_posts_with_published_locations):
+    paginator = CursorPaginator(get_queryset_posts(), 3)
+    first = paginator.page()
+    _assert_same_html("includes/paginator.html", {"page_obj": first})
+    _assert_same_html(
+        "includes/paginator.html",
+        {"page_obj": paginator.page(first.next_cursor)})
+
+
+def test_post_cards_parity(many_posts_with_published_locations):
+    page = Paginator(get_queryset_posts(), 10).page(1)
+    _assert_same_html("blog/includes/post_cards.html", {"page_obj": page})
+
+
+@pytest.mark.parametrize("shared_shell", [False, True])
+def test_comment_list_parity(
+        settings, shared_shell, mixer, user, another_user, tricky_post):
+    settings.COMMENT_LIMIT_FOR_PAGINATE = 2
+    mixer.blend("blog.Comment", post=tricky_post, author=user,
+                text="Строка\n<script>alert('x')</script>")
+    mixer.cycle(2).blend(
+        "blog.Comment", post=tricky_post, author=another_user)
+    for viewer in (user, another_user):
+        _assert_same_html("includes/comment_list.html", {
+            "post": tricky_post,
+            "comments": get_comments_page(tricky_post),
+            "user": viewer,
+            "shared_shell": shared_shell,
+        })
+
+
+def test_benchmark_command(post_with_published_location):
+    out = StringIO()
+    call_command("benchmark_jinja2", repeat=1, stdout=out)
+    assert "Jinja2" in out.getvalue()
@@ -0,0 +1,62 @@
+import pytest
+
+from blog.cache import LocalLRUCache
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_category_looked_up_once_per_request(
+        user_client, published_category, post_with_published_location,
+        django_assert_num_queries):
+    url = f"/category/{published_category.slug}/"
+    user_client.get(url)
+    # Сессия, пользователь и посты; количество постов уже в кеше.
+    with django_assert_num_queries(3):
+        response = user_client.get(url)
+    assert response.context["category"] == published_category
+
+
+def test_author_looked_up_once_per_request(
+        user, user_client, post_with_published_location,
+        django_assert_num_queries):
+    url = f"/profile/{user.username}/"
+    user_client.get(url)
+    with django_assert_num_queries(3):
+        response = user_client.get(url)
+    assert response.context["profile"] == user
+
+
+def test_category_unpublish_invalidates_lookup(
+        user_client, published_category):
+    url = f"/category/{published_category.slug}/"
+    assert user_client.get(url).status_code == 200
+    published_category.is_published = False
+    published_category.save()
+    assert user_client.get(url).status_code == 404, (
+        "Убедитесь, что снятая с публикации категория не остаётся в кеше."
+    )
+
+
+def test_username_change_invalidates_lookup(user, user_client):
+    old_url = f"/profile/{user.username}/"
+    assert user_client.get(old_url).status_code == 200
+    user.username = f"{user.username}_renamed"
+    user.save()
+    assert user_client.get(old_url).status_code == 404
+
+
+def test_local_lru_cache_evicts_oldest():
+    lru = LocalLRUCache(maxsize=2, timeout=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+    assert lru.get("a") == 1
+    assert lru.get("b") is None
+    assert lru.get("c") == 3
+
+
+def test_local_lru_cache_expires():
+    lru = LocalLRUCache(maxsize=2, timeout=-1)
+    lru.set("a", 1)
+    assert lru.get("a") is None
@@ -0,0 +1,51 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_selects(queries, table):
+    pattern = re.compile(rf'^SELECT .* FROM "{table}"')
+    return sum(bool(pattern.match(query["sql"])) for query in queries)
+
+
+@pytest.mark.parametrize("action", ("edit", "delete"))
+def test_post_fetched_once(action, user_client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/{action}/"
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(url)
+    assert response.status_code == 200
+    assert count_selects(queries, "blog_post") == 1, (
+        "Убедитесь, что при редактировании и удалении пост загружается из"
+        " базы один раз за запрос."
+    )
+
+
+@pytest.mark.parametrize("action", ("edit_comment", "delete_comment"))
+def test_comment_fetched_once(
+        action, mixer, user, user_client, post_with_published_location):
+    comment = mixer.blend(
+        Comment, post=post_with_published_location, author=user)
+    url = (f"/posts/{post_with_published_location.id}/{action}/"
+           f"{comment.id}/")
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(url)
+    assert response.status_code == 200
+    assert count_selects(queries, "blog_comment") == 1, (
+        "Убедитесь, что при редактировании и удалении комментарий"
+        " загружается из базы один раз за запрос."
+    )
+
+
+def test_comment_of_another_post_not_found(
+        mixer, user, user_client, post_with_published_location,
+        post_of_another_author):
+    comment = mixer.blend(
+        Comment, post=post_with_published_location, author=user)
+    url = f"/posts/{post_of_another_author.id}/edit_comment/{comment.id}/"
+    assert user_client.get(url).status_code == 404
@@ -0,0 +1,205 @@
+import threading
+
+import pytest
+from django.core.cache import cache, caches
+from django.test import RequestFactory
+
+from blog import mixins
+from blog.cache import GLOBAL_SCOPE, category_scope, get_page_cache_key
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post_in_another_category(mixer, another_user, another_category):
+    return mixer.blend(
+        "blog.Post", author=another_user, category=another_category)
+
+
+@pytest.fixture
+def pages(
+        post_with_published_location, post_in_another_category,
+        published_category, another_category, user, another_user):
+    return {
+        "index": "/",
+        "category": f"/category/{published_category.slug}/",
+        "another_category": f"/category/{another_category.slug}/",
+        "profile": f"/profile/{user.username}/",
+        "another_profile": f"/profile/{another_user.username}/",
+    }
+
+
+def test_anonymous_pages_are_cached(
+        client, pages, django_assert_num_queries):
+    for url in pages.values():
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.content == first.content, (
+            "Убедитесь, что страницы лент кешируются для анонимных"
+            " пользователей."
+        )
+
+
+def test_authenticated_pages_are_not_cached(user_client, pages):
+    user_client.get(pages["index"])
+    response = user_client.get(pages["index"])
+    assert response.context is not None, (
+        "Убедитесь, что страницы для авторизованных пользователей не"
+        " берутся из кеша."
+    )
+
+
+def test_comment_invalidates_only_affected_pages(
+        client, mixer, pages, post_with_published_location,
+        django_assert_num_queries):
+    for url in pages.values():
+        client.get(url)
+
+    mixer.blend(Comment, post=post_with_published_location)
+
+    for name in ("index", "category", "profile"):
+        content = client.get(pages[name]).content.decode()
+        assert "Комментарии (1)" in content, (
+            "Убедитесь, что новый комментарий сбрасывает кеш страниц,"
+            " на которых показан пост."
+        )
+    for name in ("another_category", "another_profile"):
+        with django_assert_num_queries(0):
+            client.get(pages[name])
+
+
+def test_post_category_change_invalidates_old_category(
+        client, pages, post_with_published_location, another_category):
+    client.get(pages["category"])
+    post_with_published_location.category = another_category
+    post_with_published_location.save()
+    content = client.get(pages["category"]).content.decode()
+    assert post_with_published_location.title not in content, (
+        "Убедитесь, что при переносе поста в другую категорию сбрасывается"
+        " кеш страницы прежней категории."
+    )
+
+
+def _lock_index_page():
+    key = get_page_cache_key(RequestFactory().get("/"), (GLOBAL_SCOPE,))
+    cache.add(f"{key}:lock", True)
+    return f"{key}:lock"
+
+
+def test_stale_page_served_while_regenerating(
+        client, mixer, user, published_category,
+        post_with_published_location):
+    client.get("/")
+    new_post = mixer.blend(
+        "blog.Post", author=user, category=published_category)
+    lock_key = _lock_index_page()
+    assert new_post.title not in client.get("/").content.decode(), (
+        "Убедитесь, что пока страницу собирает другой запрос, отдаётся"
+        " её последняя собранная версия."
+    )
+    cache.delete(lock_key)
+    assert new_post.title in client.get("/").content.decode()
+
+
+def test_page_regenerated_when_nothing_to_serve(
+        settings, client, post_with_published_location):
+    settings.PAGE_CACHE_WAIT_TIMEOUT = 0
+    _lock_index_page()
+    response = client.get("/")
+    assert response.status_code == 200
+    assert post_with_published_location.title in response.content.decode()
+
+
+def test_regeneration_concurrency_is_capped(
+        settings, monkeypatch, client, mixer, user, published_category,
+        post_with_published_location):
+    settings.PAGE_CACHE_WAIT_TIMEOUT = 0
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(mixins, "page_regeneration_slots", slots)
+    client.get("/")
+    slots.acquire()
+    new_post = mixer.blend(
+        "blog.Post", author=user, category=published_category)
+    assert new_post.title not in client.get("/").content.decode(), (
+        "Убедитесь, что при исчерпании лимита одновременных сборок"
+        " отдаётся последняя собранная версия страницы."
+    )
+
+
+def test_page_without_copy_waits_for_slot(
+        settings, monkeypatch, client, post_with_published_location):
+    settings.PAGE_CACHE_WAIT_TIMEOUT = 5
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(mixins, "page_regeneration_slots", slots)
+    timer = threading.Timer(0.1, slots.release)
+    timer.start()
+    response = client.get("/")
+    timer.join()
+    assert response.status_code == 200, (
+        "Убедитесь, что страница без сохранённой версии ждёт свободного"
+        " места для сборки, а не получает 503."
+    )
+
+
+def test_busy_page_without_copy_not_rendered(
+        settings, monkeypatch, client, post_with_published_location):
+    settings.PAGE_CACHE_WAIT_TIMEOUT = 0
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(mixins, "page_regeneration_slots", slots)
+    response = client.get("/")
+    assert response.status_code == 503, (
+        "Убедитесь, что при исчерпании лимита одновременных сборок"
+        " страница без сохранённой версии не собирается сверх лимита."
+    )
+    assert response.has_header("Retry-After")
+    assert not response.has_header("ETag"), (
+        "Убедитесь, что ответ 503 не получает валидаторов страницы."
+    )
+    slots.release()
+    assert client.get("/").status_code == 200
+
+
+def test_page_lock_taken_in_shared_cache(
+        settings, client, mixer, user, published_category,
+        post_with_published_location):
+    settings.CACHES = {
+        **settings.CACHES,
+        "shared": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "shared",
+        },
+    }
+    settings.SHARED_CACHE_ALIAS = "shared"
+    shared_cache = caches["shared"]
+    client.get("/")
+    new_post = mixer.blend(
+        "blog.Post", author=user, category=published_category)
+    key = get_page_cache_key(RequestFactory().get("/"), (GLOBAL_SCOPE,))
+    shared_cache.add(f"{key}:lock", True)
+    try:
+        assert new_post.title not in client.get("/").content.decode(), (
+            "Убедитесь, что блокировка сборки страницы берётся в общем кеше."
+        )
+    finally:
+        shared_cache.clear()
+
+
+def test_stale_copy_dropped_when_page_gone(
+        settings, client, published_category, post_with_published_location):
+    settings.PAGE_CACHE_WAIT_TIMEOUT = 0
+    url = f"/category/{published_category.slug}/"
+    assert client.get(url).status_code == 200
+    published_category.is_published = False
+    published_category.save()
+    assert client.get(url).status_code == 404
+    key = get_page_cache_key(
+        RequestFactory().get(url), (category_scope(published_category.slug),))
+    cache.add(f"{key}:lock", True)
+    assert client.get(url).status_code == 404, (
+        "Убедитесь, что последняя собранная версия страницы удаляется,"
+        " когда страница перестаёт отдаваться с кодом 200."
+    )
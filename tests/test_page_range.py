@@ -0,0 +1,46 @@
+import re
+
+import pytest
+
+from blog.views import PostListView
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def one_post_per_page(monkeypatch):
+    monkeypatch.setattr(PostListView, "paginate_by", 1)
+
+
+ELLIPSIS = '<span class="page-link">…</span>'
+
+
+def _page_numbers(content):
+    return re.findall(
+        r'<a class="page-link" href="\?page=(\d+)">\s*\d+', content)
+
+
+@pytest.mark.parametrize("page", [1, 15, 30])
+def test_paginator_renders_fixed_window(
+        one_post_per_page, page, mixer, user, published_category, client):
+    mixer.cycle(30).blend(
+        "blog.Post", author=user, category=published_category)
+    content = client.get(f"/?page={page}").content.decode()
+    numbers = [int(number) for number in _page_numbers(content)]
+    assert len(numbers) <= 6, (
+        "Убедитесь, что пагинатор выводит не все номера страниц,"
+        " а только окно вокруг текущей."
+    )
+    assert 1 in numbers or page == 1
+    assert 30 in numbers or page == 30
+    assert ELLIPSIS in content
+    assert f'<span class="page-link">{page}</span>' in content
+
+
+def test_paginator_keeps_all_numbers_for_few_pages(
+        one_post_per_page, mixer, user, published_category, client):
+    mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category)
+    content = client.get("/?page=2").content.decode()
+    assert _page_numbers(content) == ["1", "3"]
+    assert ELLIPSIS not in content
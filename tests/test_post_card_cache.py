@@ -0,0 +1,54 @@
+import pytest
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+CARD_TEMPLATE = "blog/includes/post_card.html"
+
+
+def rendered_cards(response):
+    return [t.name for t in response.templates].count(CARD_TEMPLATE)
+
+
+def test_cards_rendered_once(user_client, many_posts_with_published_locations):
+    first = user_client.get("/")
+    assert rendered_cards(first) == 10
+    second = user_client.get("/")
+    assert rendered_cards(second) == 0, (
+        "Убедитесь, что карточки постов берутся из кеша фрагментов."
+    )
+    assert second.content == first.content
+
+
+@pytest.mark.parametrize("change", ("post", "category", "location",
+                                   "author", "comment"))
+def test_card_cache_follows_changes(
+        change, mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get("/")
+    if change == "post":
+        post.title = "Новый заголовок"
+        post.save()
+        expected = "Новый заголовок"
+    elif change == "category":
+        post.category.title = "Новая категория"
+        post.category.save()
+        expected = "Новая категория"
+    elif change == "location":
+        post.location.name = "Новое место"
+        post.location.save()
+        expected = "Новое место"
+    elif change == "author":
+        post.author.username = "new_username"
+        post.author.save()
+        expected = "@new_username"
+    else:
+        mixer.blend(Comment, post=post)
+        expected = "Комментарии (1)"
+    response = user_client.get("/")
+    assert rendered_cards(response) == 1
+    assert expected in response.content.decode(), (
+        "Убедитесь, что кеш карточки поста сбрасывается при изменении поста,"
+        " категории, местоположения, имени автора и числа комментариев."
+    )
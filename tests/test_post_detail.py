@@ -0,0 +1,81 @@
+import pytest
+
+from blog.models import Comment
+from blog.visibility import get_feed_visibility
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def commented_post(mixer, post_with_published_location):
+    mixer.cycle(5).blend(Comment, post=post_with_published_location)
+    return post_with_published_location
+
+
+def test_detail_queries_are_bounded(
+        client, another_user_client, commented_post,
+        django_assert_num_queries):
+    url = f"/posts/{commented_post.id}/"
+    # Граница видимости постов хранится в кеше.
+    get_feed_visibility()
+    # Момент изменения поста для ETag, пост со связанными объектами
+    # и комментарии с авторами.
+    with django_assert_num_queries(3):
+        client.get(url)
+    # Плюс сессия и пользователь.
+    with django_assert_num_queries(5):
+        another_user_client.get(url)
+
+
+def test_detail_comments_are_bounded(settings, client, commented_post):
+    settings.COMMENT_LIMIT_FOR_PAGINATE = 3
+    response = client.get(f"/posts/{commented_post.id}/")
+    assert len(response.context["comments"]) == 3, (
+        "Убедитесь, что на странице поста выводится ограниченное число"
+        " комментариев."
+    )
+
+
+def test_detail_hidden_post(client, user_client, commented_post):
+    commented_post.is_published = False
+    commented_post.save()
+    url = f"/posts/{commented_post.id}/"
+    assert client.get(url).status_code == 404
+    assert user_client.get(url).status_code == 200, (
+        "Убедитесь, что автор видит свой снятый с публикации пост."
+    )
+
+
+def test_comments_fragment_loads_all_comments(
+        settings, client, commented_post):
+    settings.COMMENT_LIMIT_FOR_PAGINATE = 2
+    expected = list(
+        commented_post.comments.order_by("created_at", "id").values_list(
+            "id", flat=True))
+    response = client.get(f"/posts/{commented_post.id}/")
+    page = response.context["comments"]
+    loaded = [comment.id for comment in page]
+    assert f"/posts/{commented_post.id}/comments/?cursor=" in (
+        response.content.decode()), (
+        "Убедитесь, что на странице поста есть ссылка для подгрузки"
+        " следующих комментариев."
+    )
+    while page.has_next():
+        response = client.get(
+            f"/posts/{commented_post.id}/comments/"
+            f"?cursor={page.next_cursor}")
+        assert response.status_code == 200
+        assert "<html" not in response.content.decode()
+        page = response.context["comments"]
+        loaded.extend(comment.id for comment in page)
+    assert loaded == expected, (
+        "Убедитесь, что подгрузка комментариев выдаёт все комментарии по"
+        " одному разу в порядке их добавления."
+    )
+
+
+def test_comments_fragment_hidden_post(client, commented_post):
+    commented_post.is_published = False
+    commented_post.save()
+    response = client.get(f"/posts/{commented_post.id}/comments/")
+    assert response.status_code == 404
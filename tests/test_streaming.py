@@ -0,0 +1,94 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.mixins import StreamingFeedMixin
+from blog.views import PostListView
+
+pytestmark = [pytest.mark.django_db]
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="\w+"')
+
+
+@pytest.fixture
+def streaming(monkeypatch):
+    monkeypatch.setattr(StreamingFeedMixin, "streaming", True)
+
+
+def _normalize(content):
+    return " ".join(CSRF_RE.sub("", content).split())
+
+
+def _streamed_content(response):
+    assert response.status_code == 200
+    assert response.streaming, (
+        "Убедитесь, что при включённой настройке POST_STREAMING_FEEDS"
+        " страница ленты отдаётся потоком."
+    )
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.parametrize("cursor", [False, True])
+def test_streamed_pages_match_regular(
+        monkeypatch, cursor, user_client, many_posts_with_published_locations,
+        published_category, user):
+    monkeypatch.setattr(PostListView, "cursor_pagination", cursor)
+    urls = [
+        "/",
+        "/?page=2",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    ]
+    regular = [user_client.get(url).content.decode() for url in urls]
+    monkeypatch.setattr(StreamingFeedMixin, "streaming", True)
+    for url, content in zip(urls, regular):
+        streamed = _streamed_content(user_client.get(url))
+        assert _normalize(streamed) == _normalize(content), (
+            f"Убедитесь, что страница `{url}` при потоковой выдаче"
+            " совпадает с обычной."
+        )
+
+
+def test_head_sent_before_post_queries(
+        streaming, user_client, many_posts_with_published_locations):
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get("/")
+        first_chunk = next(iter(response.streaming_content)).decode()
+    assert "<head>" in first_chunk and "navbar" in first_chunk
+    assert 'class="card"' not in first_chunk
+    assert not [
+        q for q in ctx.captured_queries
+        if '"blog_post"."title"' in q["sql"] or "COUNT(" in q["sql"]
+    ], "Убедитесь, что начало страницы отправляется до запросов к постам."
+
+
+def test_cached_pages_not_streamed(
+        streaming, settings, client, many_posts_with_published_locations):
+    assert not client.get("/").streaming, (
+        "Убедитесь, что страницы из кеша для анонимных пользователей"
+        " собираются целиком."
+    )
+    settings.PAGE_CACHE_TIMEOUT = 0
+    assert client.get("/").streaming
+    assert not client.get("/cards/").streaming
+
+
+@pytest.mark.parametrize("cursor", [False, True])
+def test_missing_page_not_streamed(
+        monkeypatch, cursor, streaming, user_client,
+        many_posts_with_published_locations):
+    monkeypatch.setattr(PostListView, "cursor_pagination", cursor)
+    url = "/?cursor=invalid" if cursor else "/?page=100"
+    assert user_client.get(url).status_code == 404, (
+        "Убедитесь, что несуществующая страница ленты при потоковой выдаче"
+        " возвращает 404, как и без неё."
+    )
+
+
+def test_later_page_streams_after_validation(
+        streaming, user_client, many_posts_with_published_locations):
+    content = _streamed_content(user_client.get("/?page=2"))
+    assert 'class="card"' in content
+    assert content.rstrip().endswith("</html>")
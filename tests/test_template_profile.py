@@ -0,0 +1,43 @@
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+from blog.cache import precompile_templates
+
+
+def _production_engine():
+    params = dict(settings.PRODUCTION_TEMPLATES[0])
+    params.pop("BACKEND")
+    params.setdefault("APP_DIRS", False)
+    params["NAME"] = "production"
+    return DjangoTemplates(params).engine
+
+
+def test_production_profile_uses_cached_loader():
+    engine = _production_engine()
+    assert isinstance(engine.template_loaders[0], CachedLoader), (
+        "Убедитесь, что в профиле шаблонов для продакшена используется"
+        " кеширующий загрузчик."
+    )
+    assert (
+        "django.template.context_processors.debug"
+        not in engine.context_processors
+    )
+
+
+def test_precompiled_templates_exist():
+    templates = precompile_templates()
+    assert len(templates) == len(settings.PRECOMPILED_TEMPLATES), (
+        "Убедитесь, что все шаблоны из PRECOMPILED_TEMPLATES существуют."
+    )
+
+
+@pytest.mark.django_db
+def test_benchmark_command(post_with_published_location):
+    out = StringIO()
+    call_command("benchmark_templates", repeat=1, stdout=out)
+    assert "post_card.html" in out.getvalue()
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.utils import get_queryset_posts
+from blog.visibility import get_feed_visibility
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+@pytest.mark.usefixtures("post_with_published_location", "scheduled_post")
+def test_feed_query_is_stable(django_assert_num_queries):
+    first_sql = str(get_queryset_posts().query)
+    with django_assert_num_queries(0):
+        second_sql = str(get_queryset_posts().query)
+    assert first_sql == second_sql, (
+        "Убедитесь, что SQL-запрос ленты не меняется от запроса к запросу,"
+        " пока не наступила дата отложенной публикации."
+    )
+
+
+def test_scheduled_post_appears_on_time(
+        monkeypatch, post_with_published_location, scheduled_post):
+    visibility = get_feed_visibility()
+    assert visibility.next_pub_date == scheduled_post.pub_date
+    assert scheduled_post not in get_queryset_posts()
+
+    real_now = timezone.now
+    monkeypatch.setattr(
+        timezone, "now",
+        lambda: real_now() + timedelta(hours=1, seconds=1))
+    assert get_feed_visibility().cutoff == scheduled_post.pub_date
+    assert scheduled_post in get_queryset_posts(), (
+        "Убедитесь, что отложенный пост появляется в ленте сразу после"
+        " наступления даты публикации."
+    )
+
+
+def test_new_post_resets_visibility(mixer, user, published_category):
+    get_feed_visibility()
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() - timedelta(seconds=1),
+    )
+    assert post in get_queryset_posts(), (
+        "Убедитесь, что новый пост сразу появляется в ленте."
+    )